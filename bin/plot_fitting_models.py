@@ -15,6 +15,7 @@ import corner
 
 from gwemlightcurves import BHNSKilonovaLightcurve, BNSKilonovaLightcurve, SALT2
 from gwemlightcurves import lightcurve_utils
+from gwemlightcurves.universal_relations import EOSfit
 
 def parse_commandline():
     """
@@ -107,10 +108,6 @@ def ms2mc(m1,m2):
 
     return (mchirp,eta,q)
 
-def EOSfit(mns,c):
-    mb = mns*(1 + 0.8857853174243745*c**1.2082383572002926)
-    return mb
-
 # Parse command line
 opts = parse_commandline()
 
@@ -228,38 +225,22 @@ for name in names:
             if opts.model == "BNS":
                 if opts.doEOSFit:
                     mchirp_gw,eta_gw,q_gw = ms2mc(data[:,0],data[:,2])
-                    mej_gw, vej_gw = np.zeros(data[:,0].shape), np.zeros(data[:,0].shape)
-                    ii = 0
-                    for m1,c1,m2,c2 in data[:,:-1]:
-                        mb1 = EOSfit(m1,c1)
-                        mb2 = EOSfit(m2,c2)
-                        mej_gw[ii], vej_gw[ii] = bns_model(m1,mb1,c1,m2,mb2,c2)
-                        ii = ii + 1
+                    mb1_gw = EOSfit(data[:,0],data[:,1])
+                    mb2_gw = EOSfit(data[:,2],data[:,3])
+                    mej_gw, vej_gw = bns_model(data[:,0],mb1_gw,data[:,1],data[:,2],mb2_gw,data[:,3])
                 else:
                     mchirp_gw,eta_gw,q_gw = ms2mc(data[:,0],data[:,3])
-                    mej_gw, vej_gw = np.zeros(data[:,0].shape), np.zeros(data[:,0].shape)
-                    ii = 0
-                    for m1,mb1,c1,m2,mb2,c2 in data[:,:-1]:
-                        mej_gw[ii], vej_gw[ii] = bns_model(m1,mb1,c1,m2,mb2,c2)
-                        ii = ii + 1
+                    mej_gw, vej_gw = bns_model(data[:,0],data[:,1],data[:,2],data[:,3],data[:,4],data[:,5])
                 q_gw = 1/q_gw
                 mej_gw = np.log10(mej_gw)
             elif opts.model == "BHNS":
                 if opts.doEOSFit:
                     mchirp_gw,eta_gw,q_gw = ms2mc(data[:,0]*data[:,2],data[:,2])
-                    mej_gw, vej_gw = np.zeros(data[:,0].shape), np.zeros(data[:,0].shape)
-                    ii = 0
-                    for q,chi,mns,c in data[:,:-1]:
-                        mb = EOSfit(mns,c)
-                        mej_gw[ii], vej_gw[ii] = bhns_model(q,chi,mns,mb,c)
-                        ii = ii + 1
+                    mb_gw = EOSfit(data[:,2],data[:,3])
+                    mej_gw, vej_gw = bhns_model(data[:,0],data[:,1],data[:,2],mb_gw,data[:,3])
                 else:
                     mchirp_gw,eta_gw,q_gw = ms2mc(data[:,0]*data[:,2],data[:,3])
-                    mej_gw, vej_gw = np.zeros(data[:,0].shape), np.zeros(data[:,0].shape)
-                    ii = 0
-                    for q,chi,mns,mb,c in data[:,:-1]:
-                        mej_gw[ii], vej_gw[ii] = bhns_model(q,chi,mns,mb,c)
-                        ii = ii + 1
+                    mej_gw, vej_gw = bhns_model(data[:,0],data[:,1],data[:,2],data[:,3],data[:,4])
                 q_gw = 1/q_gw
                 mej_gw = np.log10(mej_gw)
 
@@ -133,6 +133,7 @@ if not os.path.isdir(plotDir):
 
 models = ["barnes_kilonova_spectra","ns_merger_spectra","kilonova_wind_spectra","ns_precursor_Lbol","BHNS","BNS","SN","tanaka_compactmergers","macronovae-rosswog","Afterglow","metzger_rprocess","korobkin_kilonova","Blue"]
 models_ref = ["Barnes et al. (2016)","Barnes and Kasen (2013)","Kasen et al. (2014)","Metzger et al. (2015)","Kawaguchi et al. (2016)","Dietrich and Ujevic (2017)","Guy et al. (2007)","Tanaka and Hotokezaka (2013)","Rosswog et al. (2017)","Van Eerten et al. (2012)","Metzger et al. (2010)","Wollaeger et al. (2017)","Metzger (2017)"]
+catalog = lightcurve_utils.load_catalog(outputDir)
 
 if opts.doAB:
 
@@ -140,13 +141,11 @@ if opts.doAB:
     filenames = []
     legend_names = []
     for name in names:
-        for ii,model in enumerate(models):
-            filename = '%s/%s/%s.dat'%(outputDir,model,name)
-            if not os.path.isfile(filename):
-                continue
-            filenames.append(filename)
-            legend_names.append(models_ref[ii])
-            break
+        model, filename = lightcurve_utils.find_model(catalog,name,"mag",models)
+        if filename is None:
+            continue
+        filenames.append(filename)
+        legend_names.append(models_ref[models.index(model)])
     
     mags, names = lightcurve_utils.read_files(filenames)
     
@@ -590,13 +589,11 @@ elif opts.doSpec:
     filenames = []
     legend_names = []
     for name in names:
-        for ii,model in enumerate(models):
-            filename = '%s/%s/%s_spec.dat'%(outputDir,model,name)
-            if not os.path.isfile(filename):
-                continue
-            filenames.append(filename)
-            legend_names.append(models_ref[ii])
-            break
+        model, filename = lightcurve_utils.find_model(catalog,name,"spec",models)
+        if filename is None:
+            continue
+        filenames.append(filename)
+        legend_names.append(models_ref[models.index(model)])
     specs, names = lightcurve_utils.read_files_spec(filenames)
 
     if opts.doEvent:
@@ -658,13 +655,11 @@ elif opts.doLuminosity:
     filenames = []
     legend_names = []
     for name in names:
-        for ii,model in enumerate(models):
-            filename = '%s/%s/%s_Lbol.dat'%(outputDir,model,name)
-            if not os.path.isfile(filename):
-                continue
-            filenames.append(filename)
-            legend_names.append(models_ref[ii])
-            break
+        model, filename = lightcurve_utils.find_model(catalog,name,"Lbol",models)
+        if filename is None:
+            continue
+        filenames.append(filename)
+        legend_names.append(models_ref[models.index(model)])
 
     Lbols, names = lightcurve_utils.read_files_lbol(filenames)
 
@@ -14,11 +14,13 @@ import matplotlib.pyplot as plt
 import corner
 
 import scipy.stats as ss
+import scipy.signal
 import plotutils.plotutils as pu
 
 import pymultinest
 from gwemlightcurves import BHNSKilonovaLightcurve, BNSKilonovaLightcurve, BlueKilonovaLightcurve, ArnettKilonovaLightcurve, SALT2
 from gwemlightcurves import lightcurve_utils
+from gwemlightcurves.universal_relations import LoveC, EOSfit
 
 def parse_commandline():
     """
@@ -49,6 +51,11 @@ def parse_commandline():
     parser.add_option("--doLoveC",  action="store_true", default=False)
     parser.add_option("--doLightcurves",  action="store_true", default=False)
     parser.add_option("--doLuminosity",  action="store_true", default=False)
+    parser.add_option("--kdeGridSize",default=0,type=int)
+    parser.add_option("--kdeBandwidth",default=None,type=float)
+    parser.add_option("--ejectaGridSize",default=50,type=int)
+    parser.add_option("--doCache",  action="store_true", default=False)
+    parser.add_option("--cacheDir",default="../cache/fitting")
     parser.add_option("-f","--filters",default="g,r,i,z")
     parser.add_option("--tmax",default=7.0,type=float)
     parser.add_option("--tmin",default=0.05,type=float)
@@ -82,54 +89,25 @@ def ms2mc(m1,m2):
 
     return (mchirp,eta,q)
 
-# Give the compactness-Love and Love-compactness relations
-# NKJ-M, 08.2017
-
-import numpy as np
-
-def CLove(lmbda):
-    """
-    Compactness-Love relation for neutron stars from Eq. (78) of Yagi and Yunes, Phys. Rep. 681, 1 (2017), using the YY coefficients and capping the compactness at the Buchdahl limit of 4/9 = 0.44... (since the fit diverges as lambda \to 0). We also cap the compactness at zero, since it becomes negative for large lambda, though these lambdas are so large that they are unlikely to be encountered in practice. In both cases, we raise an error if it runs up against either of the bounds.
-
-    Input: Dimensionless quadrupolar tidal deformability lmbda
-    Output: Compactness (mass over radius, in geometrized units, so the result is dimensionless)
-    """
-
-    # Give coefficients
-    a0 = 0.360
-    a1 = -0.0355
-    a2 = 0.000705
-
-    # Compute fit
-    lmbda = np.atleast_1d(lmbda)
-    ll = np.log(lmbda)
-    cc = a0 + (a1 + a2*ll)*ll
-
-    for kk in np.arange(len(cc)):
-        if cc[kk] > 4./9.:
-            print("Warning: Returned a compactness of 4/9 = 0.44... though the fit gives a compactness of %f for the input value of lambda = %f"%(cc[kk], lmbda[kk]))
-            cc[kk] = 4./9.
-        elif cc[kk] < 0.:
-            print("Warning: Returned a compactness of 0. though the fit gives a compactness of %f for the input value of lambda = %f"%(cc[kk], lmbda[kk]))
-            cc[kk] = 0.
-    return cc
-
-def LoveC(cc):
-    """
-    Invert the compactness-Love relation given above.
-    """
-    # Give coefficients
-    a0 = 0.360
-    a1 = -0.0355
-    a2 = 0.000705
-    ll = -(a1 + (a1*a1 - 4.*a2*(a0 - cc))**0.5)/(2.*a2)
-
-    return np.exp(ll)
-
-def greedy_kde_areas_2d(pts):
+def greedy_kde_areas_2d(pts,gridsize=0,bw_method=None,cacheDir=None):
 
     pts = np.random.permutation(pts)
 
+    # the permuted points fix the outcome, so they and the options key the
+    # cache; the random stream advances as without the cache
+    if cacheDir is not None:
+        cacheFile = os.path.join(cacheDir,"kde_%s.npz"%lightcurve_utils.cache_key(pts,gridsize,bw_method))
+        cache = lightcurve_utils.load_cache(cacheFile)
+        if cache is not None:
+            kdedir = {}
+            kdedir["kde"] = ss.gaussian_kde(cache["kde_pts"].T, bw_method=bw_method)
+            kdedir["mu"] = cache["mu"]
+            kdedir["L"] = cache["L"]
+            if gridsize > 0:
+                kdedir["grid"] = {"x": cache["x"], "y": cache["y"], "dx": cache["dx"],
+                                  "logdensity": cache["logdensity"], "logdensity_min": float(cache["logdensity_min"])}
+            return kdedir
+
     mu = np.mean(pts, axis=0)
     cov = np.cov(pts, rowvar=0)
 
@@ -142,15 +120,113 @@ def greedy_kde_areas_2d(pts):
     kde_pts = pts[:Npts/2, :]
     den_pts = pts[Npts/2:, :]
 
-    kde = ss.gaussian_kde(kde_pts.T)
+    kde = ss.gaussian_kde(kde_pts.T, bw_method=bw_method)
 
     kdedir = {}
     kdedir["kde"] = kde
     kdedir["mu"] = mu
     kdedir["L"] = L
+    if gridsize > 0:
+        kdedir["grid"] = kde_grid_2d(kde_pts,kde.covariance,gridsize)
+
+    if cacheDir is not None:
+        arrays = {"kde_pts": kde_pts, "mu": mu, "L": L}
+        if gridsize > 0:
+            arrays.update(kdedir["grid"])
+        lightcurve_utils.save_cache(cacheFile,arrays)
 
     return kdedir
 
+def bhns_ejecta_grid(qlin,chilin,mns,c,mb,cacheDir=None):
+    """
+    BHNS ejecta mass and velocity on the (qlin, chilin) grid for a neutron
+    star of mass mns, compactness c and baryonic mass mb, indexed as
+    [q, chi]. With cacheDir, the surfaces are stored per EOS and grid.
+    """
+
+    if cacheDir is not None:
+        cacheFile = os.path.join(cacheDir,"bhns_grid_%s.npz"%lightcurve_utils.cache_key(qlin,chilin,mns,c,mb))
+        cache = lightcurve_utils.load_cache(cacheFile)
+        if cache is not None:
+            return cache["mej"], cache["vej"]
+
+    QQ, CHI = np.meshgrid(qlin,chilin,indexing='ij')
+    mej, vej = BHNSKilonovaLightcurve.calc_ejecta_grid(QQ,CHI,c,mb,mns)
+
+    if cacheDir is not None:
+        lightcurve_utils.save_cache(cacheFile,{"mej": mej, "vej": vej})
+
+    return mej, vej
+
+def kde_grid_2d(pts,covariance,gridsize,nsigma=5.0):
+    """
+    Gaussian KDE of the (whitened) points pts with kernel covariance
+    covariance, evaluated on a gridsize x gridsize grid reaching nsigma
+    kernel widths beyond the points by linear binning and an FFT
+    convolution. Returns the grid axes and the log density.
+    """
+
+    sigma = np.sqrt(np.diag(covariance))
+    low = np.min(pts, axis=0) - nsigma*sigma
+    high = np.max(pts, axis=0) + nsigma*sigma
+    dx = (high-low)/(gridsize-1)
+
+    # linear binning: each point is shared between its 4 neighbouring nodes
+    x = (pts-low)/dx
+    idx = np.minimum(np.floor(x).astype(int),gridsize-2)
+    frac = x - idx
+    counts = np.zeros((gridsize,gridsize))
+    for ox in [0,1]:
+        for oy in [0,1]:
+            weights = np.abs(1-ox-frac[:,0])*np.abs(1-oy-frac[:,1])
+            np.add.at(counts,(idx[:,0]+ox,idx[:,1]+oy),weights)
+
+    # the kernel spans the whole grid, so that the tails are not truncated
+    kx, ky = np.meshgrid(np.arange(-gridsize+1,gridsize)*dx[0],np.arange(-gridsize+1,gridsize)*dx[1],indexing='ij')
+    offsets = np.vstack((kx.ravel(),ky.ravel()))
+    inv_cov = np.linalg.inv(covariance)
+    kernel = np.exp(-0.5*np.sum(offsets*np.dot(inv_cov,offsets),axis=0)).reshape(kx.shape)
+    kernel = kernel/(2*np.pi*np.sqrt(np.linalg.det(covariance)))
+
+    density = scipy.signal.fftconvolve(counts,kernel,mode='same')/float(len(pts))
+    # FFT round-off dominates far below the peak; there kde_eval falls
+    # back to the exact KDE
+    density_min = 1e-10*np.max(density)
+    density[density < density_min] = density_min
+
+    grid = {}
+    grid["x"] = np.linspace(low[0],high[0],gridsize)
+    grid["y"] = np.linspace(low[1],high[1],gridsize)
+    grid["dx"] = dx
+    grid["logdensity"] = np.log(density)
+    grid["logdensity_min"] = np.log(density_min)
+
+    return grid
+
+def kde_eval_grid(grid,truth):
+    """
+    Bilinear interpolation of the log density of a kde_grid_2d grid at the
+    whitened point truth. Returns None outside the grid and in the far
+    tails, where the grid is not accurate.
+    """
+
+    x = (truth[0]-grid["x"][0])/grid["dx"][0]
+    y = (truth[1]-grid["y"][0])/grid["dx"][1]
+    nx, ny = grid["logdensity"].shape
+    if not ((0 <= x <= nx-1) and (0 <= y <= ny-1)):
+        return None
+
+    ix = min(int(x),nx-2)
+    iy = min(int(y),ny-2)
+    fx = x-ix
+    fy = y-iy
+    logdensity = grid["logdensity"][ix:ix+2,iy:iy+2]
+    if np.min(logdensity) <= grid["logdensity_min"]:
+        return None
+
+    value = (1-fx)*(1-fy)*logdensity[0,0] + fx*(1-fy)*logdensity[1,0] + (1-fx)*fy*logdensity[0,1] + fx*fy*logdensity[1,1]
+    return np.array([np.exp(value)])
+
 def greedy_kde_areas_1d(pts):
 
     pts = np.random.permutation(pts)
@@ -175,6 +251,10 @@ def kde_eval(kdedir,truth):
     L = kdedir["L"]
 
     truth = np.linalg.solve(L, truth-mu)
+    if ("grid" in kdedir) and (truth.ndim == 1):
+        td = kde_eval_grid(kdedir["grid"],truth)
+        if td is not None:
+            return td
     td = kde(truth)
 
     return td
@@ -228,6 +308,24 @@ def arnett_model(m1,mb1,c1,m2,mb2,c2):
 
     return mej, vej
 
+def load_post(multifile):
+    """
+    np.loadtxt of a MultiNest posterior file, cached by file content in
+    opts.cacheDir with --doCache.
+    """
+
+    if not opts.doCache:
+        return np.loadtxt(multifile)
+
+    cacheFile = os.path.join(opts.cacheDir,"post_%s.npz"%lightcurve_utils.file_hash(multifile))
+    cache = lightcurve_utils.load_cache(cacheFile)
+    if cache is not None:
+        return cache["data"]
+
+    data = np.loadtxt(multifile)
+    lightcurve_utils.save_cache(cacheFile,{"data": data})
+    return data
+
 def get_post_file(basedir):
     filenames = glob.glob(os.path.join(basedir,'2-post*'))
     if len(filenames)>0:
@@ -275,13 +373,23 @@ def myprior_combined_masses_bhns(cube, ndim, nparams):
         cube[0] = cube[0]*6.0 + 3.0
         cube[1] = cube[1]*5.0 + 0.0
 
-def prior_bns(m1,mb1,c1,m2,mb2,c2):
+def prior_bns(m1,mb1,c1,m2,mb2,c2,calc_meje=None):
         if m1 < m2:
             return 0.0
-        else:
-            return 1.0
+        # baryonic masses exceed the gravitational ones, and for a common
+        # EOS the heavier star is the more compact one
+        if (mb1 < m1) or (mb2 < m2) or (c1 < c2):
+            return 0.0
+        # without ejecta there is no kilonova to compare with
+        if (calc_meje is not None) and (not calc_meje(m1,mb1,c1,m2,mb2,c2) > 0.0):
+            return 0.0
+        return 1.0
 
-def prior_bhns(q,chi_eff,mns,mb,c):
+def prior_bhns(q,chi_eff,mns,mb,c,calc_meje=None):
+        if mb < mns:
+            return 0.0
+        if (calc_meje is not None) and (not calc_meje(q,chi_eff,c,mb,mns) > 0.0):
+            return 0.0
         return 1.0
 
 def myloglike_bns(cube, ndim, nparams):
@@ -292,12 +400,13 @@ def myloglike_bns(cube, ndim, nparams):
         mb2 = cube[4]
         c2 = cube[5]
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         mej, vej = bns_model(m1,mb1,c1,m2,mb2,c2)
 
         prob = calc_prob(mej, vej)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
 
         return prob
 
@@ -309,15 +418,11 @@ def myloglike_bns_gw(cube, ndim, nparams):
         mb2 = cube[4]
         c2 = cube[5]
 
-        mej, vej = bns_model(m1,mb1,c1,m2,mb2,c2)
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
 
         prob = calc_prob_gw(m1,m2)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-
-        if prior == 0.0:
-            prob = -np.inf
-        if mej == 0.0:
-            prob = -np.inf
 
         return prob
 
@@ -329,13 +434,14 @@ def myloglike_bns_EOSFit(cube, ndim, nparams):
 
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
+
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         mej, vej = bns_model(m1,mb1,c1,m2,mb2,c2)
 
         prob = calc_prob(mej, vej)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-
-        if prior == 0.0:
-            prob = -np.inf
 
         return prob
 
@@ -347,15 +453,16 @@ def myloglike_bns_EOSFit_FixMChirp(cube, ndim, nparams):
 
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
+
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         mej, vej = bns_model(m1,mb1,c1,m2,mb2,c2)
 
         prob1 = calc_prob(mej, vej)
         prob2 = calc_prob_mchirp(m1, m2)
         prob = prob1+prob2
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-
-        if prior == 0.0:
-            prob = -np.inf
 
         return prob
 
@@ -367,15 +474,12 @@ def myloglike_bns_gw_EOSFit(cube, ndim, nparams):
 
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
-        mej, vej = bns_model(m1,mb1,c1,m2,mb2,c2)
-
-        prob = calc_prob_gw(m1, m2)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
         if prior == 0.0:
-            prob = -np.inf
-        if mej == 0.0:
-            prob = -np.inf
+            return -np.inf
+
+        prob = calc_prob_gw(m1, m2)
 
         return prob
 
@@ -386,12 +490,13 @@ def myloglike_bhns(cube, ndim, nparams):
         mb = cube[3]
         c = cube[4]
 
+        prior = prior_bhns(q,chi_eff,mns,mb,c,BHNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         mej, vej = bhns_model(q,chi_eff,mns,mb,c)
 
         prob = calc_prob(mej, vej)
-        prior = prior_bhns(q,chi_eff,mns,mb,c)
-        if prior == 0.0:
-            prob = -np.inf
 
         return prob
 
@@ -402,12 +507,14 @@ def myloglike_bhns_EOSFit(cube, ndim, nparams):
         c = cube[3]
 
         mb = EOSfit(mns,c)
+
+        prior = prior_bhns(q,chi_eff,mns,mb,c,BHNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         mej, vej = bhns_model(q,chi_eff,mns,mb,c)
 
         prob = calc_prob(mej, vej)
-        prior = prior_bhns(q,chi_eff,mns,mb,c)
-        if prior == 0.0:
-            prob = -np.inf
 
         return prob
 
@@ -418,16 +525,17 @@ def myloglike_bhns_EOSFit_FixMChirp(cube, ndim, nparams):
         c = cube[3]
 
         mb = EOSfit(mns,c)
+
+        prior = prior_bhns(q,chi_eff,mns,mb,c,BHNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         mej, vej = bhns_model(q,chi_eff,mns,mb,c)
 
         prob1 = calc_prob(mej, vej)
         prob2 = calc_prob_mchirp(q*mns, mns)
         prob = prob1+prob2
 
-        prior = prior_bhns(q,chi_eff,mns,mb,c)
-        if prior == 0.0:
-            prob = -np.inf
-
         return prob
 
 def myloglike_bhns_gw_EOSFit(cube, ndim, nparams):
@@ -437,14 +545,12 @@ def myloglike_bhns_gw_EOSFit(cube, ndim, nparams):
         c = cube[3]
 
         mb = EOSfit(mns,c)
-        mej, vej = bhns_model(q,chi_eff,mns,mb,c)
 
-        prob = calc_prob_gw(q*mns, mns)
-        prior = prior_bhns(q,chi_eff,mns,mb,c)
+        prior = prior_bhns(q,chi_eff,mns,mb,c,BHNSKilonovaLightcurve.calc_meje)
         if prior == 0.0:
-            prob = -np.inf
-        if mej == 0.0:
-            prob = -np.inf
+            return -np.inf
+
+        prob = calc_prob_gw(q*mns, mns)
 
         return prob
 
@@ -514,10 +620,6 @@ def calc_prob_mchirp(m1, m2):
         #    print mej, vej, prob
         return prob
 
-def EOSfit(mns,c):
-    mb = mns*(1 + 0.8857853174243745*c**1.2082383572002926)
-    return mb
-
 # Parse command line
 opts = parse_commandline()
 
@@ -605,6 +707,10 @@ evidence_tolerance = 0.5
 seed = 1
 np.random.seed(seed=seed)
 
+kdeCacheDir = None
+if opts.doCache:
+    kdeCacheDir = opts.cacheDir
+
 if opts.doSimulation:
     mejvar = (opts.mej*opts.errorbudget)**2
     vejvar = (opts.vej*opts.errorbudget)**2
@@ -615,7 +721,7 @@ if opts.doSimulation:
     pts = np.random.multivariate_normal(mean, cov, nsamples)
 elif opts.doModels:
     multifile = get_post_file(dataDir)
-    data = np.loadtxt(multifile) 
+    data = load_post(multifile)
 
     if opts.doEjecta:
         mej = 10**data[:,1]
@@ -640,7 +746,7 @@ elif opts.doGoingTheDistance or opts.doMassGap or opts.doEvent:
     pts = np.vstack((m1,m2)).T
 
     multifile = get_post_file(dataDir)
-    data = np.loadtxt(multifile)
+    data = load_post(multifile)
 
     filename = os.path.join(dataDir,"truth_mej_vej.dat")
     truths_mej_vej = np.loadtxt(filename)
@@ -674,7 +780,7 @@ elif opts.doGoingTheDistance or opts.doMassGap or opts.doEvent:
         q_em = 1/q_em  
         q_true = 1/q_true
 
-kdedir = greedy_kde_areas_2d(pts)
+kdedir = greedy_kde_areas_2d(pts,gridsize=opts.kdeGridSize,bw_method=opts.kdeBandwidth,cacheDir=kdeCacheDir)
 kdedir_pts = copy.deepcopy(kdedir)
 
 if opts.doModels or opts.doSimulation:
@@ -740,7 +846,7 @@ print("-" * 30, 'ANALYSIS', "-" * 30)
 print("Global Evidence:\n\t%.15e +- %.15e" % ( s['nested sampling global log-evidence'], s['nested sampling global log-evidence error'] ))
 
 multifile = get_post_file(plotDir)
-data = np.loadtxt(multifile)
+data = load_post(multifile)
 
 if (opts.doModels or opts.doSimulation) and opts.model == "BHNS" and opts.doEOSFit:
     m1 = data[:,0]*data[:,2]
@@ -756,7 +862,7 @@ if (opts.doModels or opts.doSimulation) and opts.model == "BHNS" and opts.doEOSF
 
         pymultinest.run(myloglike_bhns_EOSFit_FixMChirp, myprior_bhns_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%mchirpDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         multifile = get_post_file(mchirpDir)
-        data_mchirp = np.loadtxt(multifile)
+        data_mchirp = load_post(multifile)
 
         plotName = "%s/corner_mchirp.pdf"%(plotDir)
         figure = corner.corner(data_mchirp[:,:-1], labels=labels,
@@ -792,7 +898,7 @@ elif (opts.doModels or opts.doSimulation) and opts.model == "BNS" and opts.doEOS
         pymultinest.run(myloglike_bns_EOSFit_FixMChirp, myprior_bns_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%mchirpDir, evidence_tolerance = evidence_tolerance, multimodal = False)
 
         multifile = get_post_file(mchirpDir)
-        data_mchirp = np.loadtxt(multifile)
+        data_mchirp = load_post(multifile)
         data_new = np.zeros(data_mchirp.shape)
         labels_mchirp = [r"q",r"$M_{\rm c}$",r"$C_{\rm 1}$",r"$C_{\rm 2}$"]
         mchirp,eta,q = ms2mc(data_mchirp[:,0],data_mchirp[:,2])
@@ -815,38 +921,22 @@ elif opts.doGoingTheDistance or opts.doMassGap or opts.doEvent:
     if opts.model == "BNS" or opts.model == "Blue" or opts.model == "Arnett":
         if opts.doEOSFit:
             mchirp_gw,eta_gw,q_gw = ms2mc(data[:,0],data[:,2])
-            mej_gw, vej_gw = np.zeros(data[:,0].shape), np.zeros(data[:,0].shape)
-            ii = 0
-            for m1,c1,m2,c2 in data[:,:-1]:
-                mb1 = EOSfit(m1,c1)
-                mb2 = EOSfit(m2,c2)
-                mej_gw[ii], vej_gw[ii] = bns_model(m1,mb1,c1,m2,mb2,c2)
-                ii = ii + 1
+            mb1_gw = EOSfit(data[:,0],data[:,1])
+            mb2_gw = EOSfit(data[:,2],data[:,3])
+            mej_gw, vej_gw = bns_model(data[:,0],mb1_gw,data[:,1],data[:,2],mb2_gw,data[:,3])
         else:
             mchirp_gw,eta_gw,q_gw = ms2mc(data[:,0],data[:,3])
-            mej_gw, vej_gw = np.zeros(data[:,0].shape), np.zeros(data[:,0].shape)
-            ii = 0
-            for m1,mb1,c1,m2,mb2,c2 in data[:,:-1]:
-                mej_gw[ii], vej_gw[ii] = bns_model(m1,mb1,c1,m2,mb2,c2)
-                ii = ii + 1
+            mej_gw, vej_gw = bns_model(data[:,0],data[:,1],data[:,2],data[:,3],data[:,4],data[:,5])
         q_gw = 1/q_gw 
         mej_gw = np.log10(mej_gw)
     elif opts.model == "BHNS":
         if opts.doEOSFit:
             mchirp_gw,eta_gw,q_gw = ms2mc(data[:,0]*data[:,2],data[:,2])
-            mej_gw, vej_gw = np.zeros(data[:,0].shape), np.zeros(data[:,0].shape)
-            ii = 0
-            for q,chi,mns,c in data[:,:-1]:
-                mb = EOSfit(mns,c)
-                mej_gw[ii], vej_gw[ii] = bhns_model(q,chi,mns,mb,c)
-                ii = ii + 1
+            mb_gw = EOSfit(data[:,2],data[:,3])
+            mej_gw, vej_gw = bhns_model(data[:,0],data[:,1],data[:,2],mb_gw,data[:,3])
         else:
             mchirp_gw,eta_gw,q_gw = ms2mc(data[:,0]*data[:,2],data[:,3])
-            mej_gw, vej_gw = np.zeros(data[:,0].shape), np.zeros(data[:,0].shape)
-            ii = 0
-            for q,chi,mns,mb,c in data[:,:-1]:
-                mej_gw[ii], vej_gw[ii] = bhns_model(q,chi,mns,mb,c)
-                ii = ii + 1
+            mej_gw, vej_gw = bhns_model(data[:,0],data[:,1],data[:,2],data[:,3],data[:,4])
         q_gw = 1/q_gw
         mej_gw = np.log10(mej_gw)
 
@@ -857,8 +947,8 @@ elif opts.doGoingTheDistance or opts.doMassGap or opts.doEvent:
     if opts.doEjecta:
         pts_em = np.vstack((mej_em,vej_em)).T
         pts_gw = np.vstack((mej_gw,vej_gw)).T
-        kdedir_em = greedy_kde_areas_2d(pts_em)
-        kdedir_gw = greedy_kde_areas_2d(pts_gw)
+        kdedir_em = greedy_kde_areas_2d(pts_em,gridsize=opts.kdeGridSize,bw_method=opts.kdeBandwidth,cacheDir=kdeCacheDir)
+        kdedir_gw = greedy_kde_areas_2d(pts_gw,gridsize=opts.kdeGridSize,bw_method=opts.kdeBandwidth,cacheDir=kdeCacheDir)
 
         parameters = ["mej","vej"]
         n_params = len(parameters)
@@ -866,7 +956,7 @@ elif opts.doGoingTheDistance or opts.doMassGap or opts.doEvent:
 
         labels_combined = [r"log10 ${\rm M}_{\rm ej}$",r"${\rm v}_{\rm ej}$"]
         multifile = get_post_file(combinedDir)
-        data_combined = np.loadtxt(multifile)
+        data_combined = load_post(multifile)
         mej_combined = data_combined[:,0]
         vej_combined = data_combined[:,1]
         data_combined = np.vstack((mej_combined,vej_combined)).T
@@ -884,8 +974,8 @@ elif opts.doGoingTheDistance or opts.doMassGap or opts.doEvent:
         pts_em = np.vstack((q_em,mchirp_em)).T
         pts_gw = np.vstack((q_gw,mchirp_gw)).T
 
-        kdedir_em = greedy_kde_areas_2d(pts_em)
-        kdedir_gw = greedy_kde_areas_2d(pts_gw)
+        kdedir_em = greedy_kde_areas_2d(pts_em,gridsize=opts.kdeGridSize,bw_method=opts.kdeBandwidth,cacheDir=kdeCacheDir)
+        kdedir_gw = greedy_kde_areas_2d(pts_gw,gridsize=opts.kdeGridSize,bw_method=opts.kdeBandwidth,cacheDir=kdeCacheDir)
 
         parameters = ["q","mchirp"]
         n_params = len(parameters)
@@ -896,7 +986,7 @@ elif opts.doGoingTheDistance or opts.doMassGap or opts.doEvent:
 
         labels_combined = [r"$q$",r"${\rm M}_{\rm c}$"]
         multifile = get_post_file(combinedDir)
-        data_combined = np.loadtxt(multifile)
+        data_combined = load_post(multifile)
         q_combined = data_combined[:,0]
         mchirp_combined = data_combined[:,1]
         data_combined = np.vstack((q_combined,mchirp_combined)).T
@@ -1088,23 +1178,18 @@ if opts.model == "BHNS":
     chi_min = -1.0
     chi_max = 1.0
 
-    qlin = np.linspace(q_min,q_max,50)
-    chilin = np.linspace(chi_min,chi_max,51)
+    qlin = np.linspace(q_min,q_max,opts.ejectaGridSize)
+    chilin = np.linspace(chi_min,chi_max,opts.ejectaGridSize+1)
 
     qlin = (qlin[:-1] + qlin[1:])/2.0
     chilin = (chilin[:-1] + chilin[1:])/2.0
 
     QGRID,CHIGRID = np.meshgrid(qlin,chilin)
-    MGRID = np.zeros(QGRID.shape).T
-    VGRID = np.zeros(QGRID.shape).T
 
     c = 0.147
     mb = 1.47
     mns = 1.35
-    for ii in xrange(len(qlin)):
-        for jj in xrange(len(chilin)):
-            MGRID[ii,jj] = BHNSKilonovaLightcurve.calc_meje(qlin[ii],chilin[jj],c,mb,mns)
-            VGRID[ii,jj] = BHNSKilonovaLightcurve.calc_vave(qlin[ii])
+    MGRID, VGRID = bhns_ejecta_grid(qlin,chilin,mns,c,mb,cacheDir=kdeCacheDir)
 
     plt.figure(figsize=(12,10))
     plt.pcolormesh(QGRID,CHIGRID,MGRID.T,vmin=np.min(MGRID),vmax=np.max(MGRID))
@@ -12,6 +12,7 @@ import matplotlib.pyplot as plt
 
 import pymultinest
 import lightcurve_utils
+from gwemlightcurves import lightcurve_store
 
 def parse_commandline():
     """
@@ -64,29 +65,6 @@ def myloglike(cube, ndim, nparams):
         #    print c,b,tc,t0, prob
         return prob
 
-def loadLightcurves(filename):
-    lines = [line.rstrip('\n') for line in open(filename)]
-    lines = lines[1:]
-    lines = filter(None,lines)
-    
-    data = {}
-    for line in lines:
-        lineSplit = line.split(" ")
-        numid = float(lineSplit[0])
-        psid = lineSplit[1]
-        filt = lineSplit[2]
-        mjd = float(lineSplit[3])
-        mag = float(lineSplit[4])
-        dmag = float(lineSplit[5])
-    
-        if not psid in data:
-            data[psid] = {}
-        if not filt in data[psid]:
-            data[psid][filt] = np.empty((0,3), float)
-        data[psid][filt] = np.append(data[psid][filt],np.array([[mjd,mag,dmag]]),axis=0)
-
-    return data
-
 def loadModels(name):
 
     models = ["barnes_kilonova_spectra","ns_merger_spectra","kilonova_wind_spectra","ns_precursor_AB","BHNS"]
@@ -138,13 +116,12 @@ if opts.doModels:
     print stop
 
 else:
-    data_out = loadLightcurves(filename)
-    if not opts.name in data_out:
+    store = lightcurve_store.open_store(filename)
+    data_out = lightcurve_store.load_object(store,opts.name)
+    if data_out is None:
         print "%s not in file..."%opts.name
         exit(0)
 
-    data_out = data_out[opts.name]
-
     for ii,key in enumerate(data_out.iterkeys()):
         if ii == 0:
             samples = data_out[key].copy()
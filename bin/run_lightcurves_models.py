@@ -16,7 +16,8 @@ import corner
 
 import pymultinest
 from gwemlightcurves import BHNSKilonovaLightcurve, BNSKilonovaLightcurve, SALT2, BlueKilonovaLightcurve, ArnettKilonovaLightcurve
-from gwemlightcurves import lightcurve_utils
+from gwemlightcurves import lightcurve_utils, lightcurve_grid, lightcurve_emulator, lightcurve_likelihood, lightcurve_store
+from gwemlightcurves.universal_relations import EOSfit
 
 def parse_commandline():
     """
@@ -39,10 +40,16 @@ def parse_commandline():
     parser.add_option("--doMassGap",  action="store_true", default=False)
     parser.add_option("--doReduced",  action="store_true", default=False)
     parser.add_option("--doFixZPT0",  action="store_true", default=False) 
+    parser.add_option("--doMarginalizeZP",  action="store_true", default=False)
     parser.add_option("--doEOSFit",  action="store_true", default=False)
     parser.add_option("-m","--model",default="BHNS")
     parser.add_option("--doMasses",  action="store_true", default=False)
     parser.add_option("--doEjecta",  action="store_true", default=False)
+    parser.add_option("--doGrid",  action="store_true", default=False)
+    parser.add_option("-g","--gridDir",default="../grids")
+    parser.add_option("--doEmulator",  action="store_true", default=False)
+    parser.add_option("--emulatorDir",default="../emulators")
+    parser.add_option("--doDataTimes",  action="store_true", default=False)
     parser.add_option("-e","--errorbudget",default=1.0,type=float)
     parser.add_option("-f","--filters",default="g,r,i,z")
     parser.add_option("--tmax",default=7.0,type=float)
@@ -112,12 +119,16 @@ def bhns_model(q,chi_eff,mns,mb,c,th,ph):
     alp = 1.2
     eth = 0.5
     
-    t, lbol, mag = BHNSKilonovaLightcurve.lightcurve(tini,tmax,dt,vmin,th,ph,kappa,eps,alp,eth,q,chi_eff,c,mb,mns)
+    t, lbol, mag = BHNSKilonovaLightcurve.lightcurve(tini,tmax,dt,vmin,th,ph,kappa,eps,alp,eth,q,chi_eff,c,mb,mns,tvec=tmodel)
 
     return t, lbol, mag
 
 def bhns_model_ejecta(mej,vej,th,ph):
 
+    if opts.doGrid:
+        t, lbol, mag = lightcurve_grid.lightcurve(grid,mej,vej,th,ph)
+        return t, lbol, mag
+
     tini = 0.1
     tmax = 50.0
     dt = 0.1
@@ -128,7 +139,7 @@ def bhns_model_ejecta(mej,vej,th,ph):
     alp = 1.2
     eth = 0.5
 
-    t, lbol, mag = BHNSKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,vmin,th,ph,kappa,eps,alp,eth)
+    t, lbol, mag = BHNSKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,vmin,th,ph,kappa,eps,alp,eth,tvec=tmodel)
 
     return t, lbol, mag
 
@@ -138,17 +149,24 @@ def blue_model(m1,mb1,c1,m2,mb2,c2,beta,kappa_r):
     tmax = 50.0
     dt = 0.1
 
-    t, lbol, mag, Tobs = BlueKilonovaLightcurve.lightcurve(tini,tmax,dt,beta,kappa_r,m1,mb1,c1,m2,mb2,c2)
+    t, lbol, mag, Tobs = BlueKilonovaLightcurve.lightcurve(tini,tmax,dt,beta,kappa_r,m1,mb1,c1,m2,mb2,c2,tvec=tmodel)
 
     return t, lbol, mag
 
 def blue_model_ejecta(mej,vej,beta,kappa_r):
 
+    if opts.doGrid:
+        t, lbol, mag = lightcurve_grid.lightcurve(grid,mej,vej,beta,kappa_r)
+        return t, lbol, mag
+    elif opts.doEmulator:
+        t, lbol, mag = lightcurve_emulator.lightcurve(emulator,mej,vej,beta,kappa_r)
+        return t, lbol, mag
+
     tini = 0.1
     tmax = 50.0
     dt = 0.1
 
-    t, lbol, mag, Tobs = BlueKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,beta,kappa_r)
+    t, lbol, mag, Tobs = BlueKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,beta,kappa_r,tvec=tmodel)
 
     return t, lbol, mag
 
@@ -158,17 +176,24 @@ def arnett_model(m1,mb1,c1,m2,mb2,c2,slope_r,kappa_r):
     tmax = 50.0
     dt = 0.1
 
-    t, lbol, mag, Tobs = ArnettKilonovaLightcurve.lightcurve(tini,tmax,dt,slope_r,kappa_r,m1,mb1,c1,m2,mb2,c2)
+    t, lbol, mag, Tobs = ArnettKilonovaLightcurve.lightcurve(tini,tmax,dt,slope_r,kappa_r,m1,mb1,c1,m2,mb2,c2,tvec=tmodel)
 
     return t, lbol, mag
 
 def arnett_model_ejecta(mej,vej,slope_r,kappa_r):
 
+    if opts.doGrid:
+        t, lbol, mag = lightcurve_grid.lightcurve(grid,mej,vej,slope_r,kappa_r)
+        return t, lbol, mag
+    elif opts.doEmulator:
+        t, lbol, mag = lightcurve_emulator.lightcurve(emulator,mej,vej,slope_r,kappa_r)
+        return t, lbol, mag
+
     tini = 0.1
     tmax = 50.0
     dt = 0.1
 
-    t, lbol, mag, Tobs = ArnettKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,slope_r,kappa_r)
+    t, lbol, mag, Tobs = ArnettKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,slope_r,kappa_r,tvec=tmodel)
 
     return t, lbol, mag
 
@@ -186,12 +211,16 @@ def bns_model(m1,mb1,c1,m2,mb2,c2,th,ph):
 
     flgbct = 1
 
-    t, lbol, mag = BNSKilonovaLightcurve.lightcurve(tini,tmax,dt,vmin,th,ph,kappa,eps,alp,eth,m1,mb1,c1,m2,mb2,c2,flgbct)
+    t, lbol, mag = BNSKilonovaLightcurve.lightcurve(tini,tmax,dt,vmin,th,ph,kappa,eps,alp,eth,m1,mb1,c1,m2,mb2,c2,flgbct,tvec=tmodel)
 
     return t, lbol, mag
 
 def bns_model_ejecta(mej,vej,th,ph):
 
+    if opts.doGrid:
+        t, lbol, mag = lightcurve_grid.lightcurve(grid,mej,vej,th,ph)
+        return t, lbol, mag
+
     tini = 0.1
     tmax = 50.0
     dt = 0.1
@@ -205,7 +234,7 @@ def bns_model_ejecta(mej,vej,th,ph):
 
     flgbct = 1
 
-    t, lbol, mag = BNSKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,vmin,th,ph,kappa,eps,alp,eth,flgbct)
+    t, lbol, mag = BNSKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,vmin,th,ph,kappa,eps,alp,eth,flgbct,tvec=tmodel)
 
     return t, lbol, mag
 
@@ -215,7 +244,7 @@ def sn_model(z,t0,x0,x1,c):
     tmax = 50.0
     dt = 0.1
 
-    t, lbol, mag = SALT2.lightcurve(tini,tmax,dt,z,t0,x0,x1,c)
+    t, lbol, mag = SALT2.lightcurve(tini,tmax,dt,z,t0,x0,x1,c,tvec=tmodel)
 
     return t, lbol, mag
 
@@ -241,9 +270,9 @@ def myprior_bhns(cube, ndim, nparams):
 def myprior_bhns_ejecta(cube, ndim, nparams):
         cube[0] = cube[0]*2*T0Range - T0Range
         cube[1] = cube[1]*5.0 - 5.0
-        cube[2] = cube[2]*1.0
+        cube[2] = cube[2]*(VejRange[1]-VejRange[0]) + VejRange[0]
         cube[3] = cube[3]*np.pi/2
-        cube[4] = cube[4]*2*np.pi
+        cube[4] = cube[4]*(PhRange[1]-PhRange[0]) + PhRange[0]
         cube[5] = cube[5]*2*ZPRange - ZPRange
 
 def myprior_bhns_EOSFit(cube, ndim, nparams):
@@ -256,13 +285,23 @@ def myprior_bhns_EOSFit(cube, ndim, nparams):
         cube[6] = cube[6]*2*np.pi
         cube[7] = cube[7]*2*ZPRange - ZPRange
 
-def prior_bns(m1,mb1,c1,m2,mb2,c2):
+def prior_bns(m1,mb1,c1,m2,mb2,c2,calc_meje=None):
         if m1 < m2:
             return 0.0
-        else:
-            return 1.0
+        # baryonic masses exceed the gravitational ones, and for a common
+        # EOS the heavier star is the more compact one
+        if (mb1 < m1) or (mb2 < m2) or (c1 < c2):
+            return 0.0
+        # without ejecta there is no kilonova to compare with
+        if (calc_meje is not None) and (not calc_meje(m1,mb1,c1,m2,mb2,c2) > 0.0):
+            return 0.0
+        return 1.0
 
-def prior_bhns(q,chi_eff,mns,mb,c):
+def prior_bhns(q,chi_eff,mns,mb,c,calc_meje=None):
+        if mb < mns:
+            return 0.0
+        if (calc_meje is not None) and (not calc_meje(q,chi_eff,c,mb,mns) > 0.0):
+            return 0.0
         return 1.0
 
 def myprior_blue(cube, ndim, nparams):
@@ -311,18 +350,18 @@ def myprior_arnett_EOSFit(cube, ndim, nparams):
 
 def myprior_blue_ejecta(cube, ndim, nparams):
         cube[0] = cube[0]*2*T0Range - T0Range
-        cube[1] = cube[1]*5.0 - 5.0
-        cube[2] = cube[2]*1.0
-        cube[3] = cube[3]*10.0
-        cube[4] = cube[4]*4.0 - 2.0
+        cube[1] = cube[1]*(LogMejRange[1]-LogMejRange[0]) + LogMejRange[0]
+        cube[2] = cube[2]*(VejRange[1]-VejRange[0]) + VejRange[0]
+        cube[3] = cube[3]*(BetaRange[1]-BetaRange[0]) + BetaRange[0]
+        cube[4] = cube[4]*(LogKappaRange[1]-LogKappaRange[0]) + LogKappaRange[0]
         cube[5] = cube[5]*2*ZPRange - ZPRange
 
 def myprior_arnett_ejecta(cube, ndim, nparams):
         cube[0] = cube[0]*2*T0Range - T0Range
-        cube[1] = cube[1]*5.0 - 5.0
-        cube[2] = cube[2]*1.0
-        cube[3] = cube[3]*10.0 - 5.0
-        cube[4] = cube[4]*4.0 - 2.0
+        cube[1] = cube[1]*(LogMejRange[1]-LogMejRange[0]) + LogMejRange[0]
+        cube[2] = cube[2]*(VejRange[1]-VejRange[0]) + VejRange[0]
+        cube[3] = cube[3]*(SlopeRange[1]-SlopeRange[0]) + SlopeRange[0]
+        cube[4] = cube[4]*(LogKappaRange[1]-LogKappaRange[0]) + LogKappaRange[0]
         cube[5] = cube[5]*2*ZPRange - ZPRange
 
 def myprior_bns(cube, ndim, nparams):
@@ -350,9 +389,9 @@ def myprior_bns_EOSFit(cube, ndim, nparams):
 def myprior_bns_ejecta(cube, ndim, nparams):
         cube[0] = cube[0]*2*T0Range - T0Range
         cube[1] = cube[1]*5.0 - 5.0
-        cube[2] = cube[2]*1.0
+        cube[2] = cube[2]*(VejRange[1]-VejRange[0]) + VejRange[0]
         cube[3] = cube[3]*np.pi/2
-        cube[4] = cube[4]*2*np.pi
+        cube[4] = cube[4]*(PhRange[1]-PhRange[0]) + PhRange[0]
         cube[5] = cube[5]*2*ZPRange - ZPRange
 
 def myprior_sn(cube, ndim, nparams):
@@ -405,12 +444,13 @@ def myloglike_blue(cube, ndim, nparams):
         kappa_r = 10**cube[8]
         zp = cube[9]
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BlueKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = blue_model(m1,mb1,c1,m2,mb2,c2,beta,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -427,12 +467,13 @@ def myloglike_arnett(cube, ndim, nparams):
         kappa_r = 10**cube[8]
         zp = cube[9]
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,ArnettKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = arnett_model(m1,mb1,c1,m2,mb2,c2,slope_r,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -446,7 +487,7 @@ def myloglike_blue_ejecta(cube, ndim, nparams):
 
         tmag, lbol, mag = blue_model_ejecta(mej,vej,beta,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -460,7 +501,7 @@ def myloglike_arnett_ejecta(cube, ndim, nparams):
 
         tmag, lbol, mag = arnett_model_ejecta(mej,vej,slope_r,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -478,12 +519,13 @@ def myloglike_blue_EOSFit(cube, ndim, nparams):
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BlueKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = blue_model(m1,mb1,c1,m2,mb2,c2,beta,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
     
@@ -501,12 +543,13 @@ def myloglike_arnett_EOSFit(cube, ndim, nparams):
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,ArnettKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = arnett_model(m1,mb1,c1,m2,mb2,c2,slope_r,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -523,12 +566,13 @@ def myloglike_bns(cube, ndim, nparams):
         ph = cube[8]
         zp = cube[9]
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = bns_model(m1,mb1,c1,m2,mb2,c2,th,ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -542,7 +586,7 @@ def myloglike_bns_ejecta(cube, ndim, nparams):
 
         tmag, lbol, mag = bns_model_ejecta(mej,vej,th,ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -560,12 +604,13 @@ def myloglike_bns_EOSFit(cube, ndim, nparams):
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = bns_model(m1,mb1,c1,m2,mb2,c2,th,ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -580,12 +625,13 @@ def myloglike_bhns(cube, ndim, nparams):
         ph = cube[7]
         zp = cube[8]
 
+        prior = prior_bhns(q,chi_eff,mns,mb,c,BHNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = bhns_model(q, chi_eff, mns, mb, c, th, ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bhns(q,chi_eff,mns,mb,c)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -599,7 +645,7 @@ def myloglike_bhns_ejecta(cube, ndim, nparams):
 
         tmag, lbol, mag = bhns_model_ejecta(mej,vej,th,ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -615,12 +661,13 @@ def myloglike_bhns_EOSFit(cube, ndim, nparams):
 
         mb = EOSfit(mns,c)
 
+        prior = prior_bhns(q,chi_eff,mns,mb,c,BHNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = bhns_model(q, chi_eff, mns, mb, c, th, ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bhns(q,chi_eff,mns,mb,c)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -641,98 +688,13 @@ def myloglike_sn(cube, ndim, nparams):
 
         tmag, lbol, mag = sn_model(z, 0.0 ,x0,x1,c)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
 def calc_prob(tmag, lbol, mag, t0, zp): 
 
-        if np.sum(lbol) == 0.0:
-            prob = -np.inf
-            return prob
-        tmag = tmag + t0
-
-        count = 0
-        chisquare = np.nan
-        gaussprob = np.nan
-        for key in data_out:
-            samples = data_out[key]
-            t = samples[:,0]
-            y = samples[:,1]
-            sigma_y = samples[:,2]
-
-            idx = np.where(~np.isnan(y))[0]
-            t = t[idx]
-            y = y[idx]
-            sigma_y = sigma_y[idx]
-
-            if not key in filters: continue
-
-            keyslist = ["u","g","r","i","z","y","J","H","K"]
-
-            if key in keyslist:
-                idx = keyslist.index(key)
-                ii = np.where(~np.isnan(mag[idx]))[0]
-                if len(ii) == 0:
-                    maginterp = np.nan*np.ones(t.shape)
-                else:
-                    f = interp.interp1d(tmag[ii], mag[idx][ii], fill_value='extrapolate')
-                    maginterp = f(t)
-            elif key == "w":
-                magave = (mag[1]+mag[2]+mag[3])/3.0
-                ii = np.where(~np.isnan(magave))[0]
-                if len(ii) == 0:
-                    maginterp = np.nan*np.ones(t.shape)
-                else:
-                    f = interp.interp1d(tmag[ii], magave[ii], fill_value='extrapolate')
-                    maginterp = f(t)
-            else:
-                continue
-
-            maginterp = maginterp + zp
-
-            sigma = np.sqrt(errorbudget**2 + sigma_y**2)
-            chisquarevals = np.zeros(y.shape)
-            chisquarevals = ((y-maginterp)/sigma)**2
-            idx = np.where(~np.isfinite(sigma))[0]
-            if len(idx) > 0:
-                gaussprobvals = scipy.stats.norm.cdf(y[idx], maginterp[idx], errorbudget)
-                gaussprobsum = np.sum(np.log(gaussprobvals)) 
-            else:
-                gaussprobsum = 0.0
-
-            chisquaresum = np.sum(chisquarevals)
-            if np.isnan(chisquaresum):
-                chisquare = np.nan
-                break
-
-            if not float(len(chisquarevals)-1) == 0:
-                chisquaresum = (1/float(len(chisquarevals)-1))*chisquaresum
-
-            if count == 0:
-                chisquare = chisquaresum
-                gaussprob = gaussprobsum
-            else:
-                chisquare = chisquare + chisquaresum
-                gaussprob = gaussprob + gaussprobsum
-            #count = count + len(chisquarevals)
-            count = count + 1
-
-        if np.isnan(chisquare): 
-            prob = -np.inf
-        else:
-            #prob = scipy.stats.chi2.logpdf(chisquare, count, loc=0, scale=1)
-            #prob = -chisquare/2.0
-            #prob = chisquare
-            chiprob = scipy.stats.chi2.logpdf(chisquare, 1, loc=0, scale=1)
-            prob = chiprob + gaussprob
-
-        if np.isnan(prob):
-            prob = -np.inf
-
-        #if np.isfinite(prob):
-        #    print t0, zp, prob
-        return prob
+        return lightcurve_likelihood.calc_prob(likelihood, tmag, lbol, mag, t0, zp)
 
 def get_truths(name,model):
     truths = []
@@ -775,10 +737,6 @@ def get_truths(name,model):
         truths = [0,np.log10(0.0079), 0.12,False,False,False]
     return truths
 
-def EOSfit(mns,c):
-    mb = mns*(1 + 0.8857853174243745*c**1.2082383572002926)
-    return mb
-
 # Parse command line
 opts = parse_commandline()
 
@@ -793,8 +751,57 @@ else:
     ZPRange = 50.0
     T0Range = 5.0
 
+# prior ranges of the *_ejecta fits, restricted below for grids and emulators
+LogMejRange = [-5.0,0.0]
+VejRange = [0.0,1.0]
+BetaRange = [0.0,10.0]
+SlopeRange = [-5.0,5.0]
+LogKappaRange = [-2.0,2.0]
+PhRange = [0.0,2*np.pi]
+
+if opts.doMarginalizeZP and opts.doFixZPT0:
+    # the analytic zp marginalization assumes a wide zp prior
+    print "--doMarginalizeZP and --doFixZPT0 are exclusive"
+    exit(0)
+
 filters = opts.filters.split(",")
 
+if opts.doGrid:
+    if not opts.doEjecta:
+        print "--doGrid requires --doEjecta"
+        exit(0)
+    grid = lightcurve_grid.load_grid(os.path.join(opts.gridDir,"%s.npz"%opts.model))
+    # grids do not reach vej = 0 (or beta = 0 for Blue, ph = 0 for BNS and
+    # BHNS), where the models are singular, so the priors are restricted to
+    # the grid axes
+    VejRange = lightcurve_grid.param_range(grid,"vej")
+    print "Restricting the vej prior to the grid range [%.3f, %.3f]"%(VejRange[0],VejRange[1])
+    if opts.model == "Blue":
+        BetaRange = lightcurve_grid.param_range(grid,"beta")
+        print "Restricting the beta prior to the grid range [%.3f, %.3f]"%(BetaRange[0],BetaRange[1])
+    elif opts.model in ["BNS","BHNS"]:
+        PhRange = lightcurve_grid.param_range(grid,"ph")
+        print "Restricting the ph prior to the grid range [%.3f, %.3f]"%(PhRange[0],PhRange[1])
+elif opts.doEmulator:
+    if not opts.doEjecta or not opts.model in lightcurve_emulator.EMULATOR_MODELS:
+        print "--doEmulator requires --doEjecta and model %s"%(" or ".join(sorted(lightcurve_emulator.EMULATOR_MODELS.keys())))
+        exit(0)
+    emulator = lightcurve_emulator.load_emulator(os.path.join(opts.emulatorDir,"%s.npz"%opts.model))
+    # emulators return lbol = 0 outside their training ranges, which cover
+    # only part of the priors, so the priors are restricted to those ranges
+    LogMejRange = list(np.log10(lightcurve_emulator.param_range(emulator,"mej")))
+    VejRange = lightcurve_emulator.param_range(emulator,"vej")
+    LogKappaRange = list(np.log10(lightcurve_emulator.param_range(emulator,"kappa_r")))
+    print "Restricting the log10 mej prior to the emulator range [%.3f, %.3f]"%(LogMejRange[0],LogMejRange[1])
+    print "Restricting the vej prior to the emulator range [%.3f, %.3f]"%(VejRange[0],VejRange[1])
+    if opts.model == "Blue":
+        BetaRange = lightcurve_emulator.param_range(emulator,"beta")
+        print "Restricting the beta prior to the emulator range [%.3f, %.3f]"%(BetaRange[0],BetaRange[1])
+    else:
+        SlopeRange = lightcurve_emulator.param_range(emulator,"slope_r")
+        print "Restricting the slope_r prior to the emulator range [%.3f, %.3f]"%(SlopeRange[0],SlopeRange[1])
+    print "Restricting the log10 kappa_r prior to the emulator range [%.3f, %.3f]"%(LogKappaRange[0],LogKappaRange[1])
+
 baseplotDir = opts.plotDir
 if opts.doModels:
     basename = 'models'
@@ -841,9 +848,20 @@ else:
     filename = "%s/lightcurves.tmp"%lightcurvesDir
 
 errorbudget = opts.errorbudget
+if opts.doGrid:
+    # grid interpolation error in quadrature with the photometric error budget
+    if not np.all(np.isfinite(grid["rms"])):
+        print "Warning: grid %s has no validation RMS, rebuild it with run_model_grid.py"%opts.model
+    print "Grid interpolation RMS %.3f mag"%lightcurve_grid.errorbudget(grid,filters)
+    errorbudget = np.sqrt(errorbudget**2 + lightcurve_grid.errorbudget(grid,filters)**2)
+elif opts.doEmulator:
+    # emulator error in quadrature with the photometric error budget
+    errorbudget = np.sqrt(errorbudget**2 + lightcurve_emulator.errorbudget(emulator,filters)**2)
 mint = opts.tmin
 maxt = opts.tmax
 dt = opts.dt
+# model epochs; None evaluates the models on their full time grid
+tmodel = None
 n_live_points = 1000
 evidence_tolerance = 0.5
 
@@ -979,13 +997,12 @@ else:
     if opts.doEvent:
         data_out = lightcurve_utils.loadEvent(filename)
     else:
-        data_out = lightcurve_utils.loadLightcurves(filename)
-        if not opts.name in data_out:
+        store = lightcurve_store.open_store(filename)
+        data_out = lightcurve_store.load_object(store,opts.name)
+        if data_out is None:
             print "%s not in file..."%opts.name
             exit(0)
 
-        data_out = data_out[opts.name]
-
     for ii,key in enumerate(data_out.iterkeys()):
         if key == "t":
             continue
@@ -1036,6 +1053,13 @@ else:
         fid.write('%.5f %.5f %.5f %.5f\n'%(np.nan,np.nan,np.nan,np.nan))
         fid.close()
 
+if opts.doDataTimes and not (opts.doGrid or opts.doEmulator):
+    # only evaluate the models where the likelihood samples them, i.e. at
+    # the observations shifted by up to T0Range, on the 0.1 day model grid
+    tmodel = lightcurve_utils.calc_model_times(data_out,filters,t0range=T0Range,dt=0.1)
+
+likelihood = lightcurve_likelihood.setup(data_out,filters,errorbudget,zprange=ZPRange,marginalize=opts.doMarginalizeZP)
+
 if opts.model in ["BHNS","BNS","Blue","Arnett"]:
 
     if opts.doMasses:
@@ -1044,66 +1068,78 @@ if opts.model in ["BHNS","BNS","Blue","Arnett"]:
                 parameters = ["t0","q","chi_eff","mns","c","th","ph","zp"]
                 labels = [r"$T_0$",r"$q$",r"$\chi_{\rm eff}$",r"$M_{\rm ns}$",r"$C$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_bhns_EOSFit, myprior_bhns_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_bhns_EOSFit, myprior_bhns_EOSFit, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
             else:
                 parameters = ["t0","q","chi_eff","mns","mb","c","th","ph","zp"]
                 labels = [r"$T_0$",r"$q$",r"$\chi_{\rm eff}$",r"$M_{\rm ns}$",r"$M_{\rm b}$",r"$C$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_bhns, myprior_bhns, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_bhns, myprior_bhns, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "BNS":
             if opts.doEOSFit:
                 parameters = ["t0","m1","c1","m2","c2","th","ph","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$C_{\rm 2}$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_bns_EOSFit, myprior_bns_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_bns_EOSFit, myprior_bns_EOSFit, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
             else:
                 parameters = ["t0","m1","mb1","c1","m2","mb2","c2","th","ph","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$M_{\rm b1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$M_{\rm b2}$",r"$C_{\rm 2}$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_bns, myprior_bns, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_bns, myprior_bns, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "Blue":
             if opts.doEOSFit:
                 parameters = ["t0","m1","c1","m2","c2","beta","kappa_r","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$C_{\rm 2}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_blue_EOSFit, myprior_blue_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_blue_EOSFit, myprior_blue_EOSFit, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
             else:
                 parameters = ["t0","m1","mb1","c1","m2","mb2","c2","beta","kappa_r","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$M_{\rm b1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$M_{\rm b2}$",r"$C_{\rm 2}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_blue, myprior_blue, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_blue, myprior_blue, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "Arnett":
             if opts.doEOSFit:
                 parameters = ["t0","m1","c1","m2","c2","beta","kappa_r","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$C_{\rm 2}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_arnett_EOSFit, myprior_arnett_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_arnett_EOSFit, myprior_arnett_EOSFit, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
             else:
                 parameters = ["t0","m1","mb1","c1","m2","mb2","c2","beta","kappa_r","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$M_{\rm b1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$M_{\rm b2}$",r"$C_{\rm 2}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_arnett, myprior_arnett, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_arnett, myprior_arnett, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
     elif opts.doEjecta:
         if opts.model == "BHNS":
             parameters = ["t0","mej","vej","th","ph","zp"]
             labels = [r"$T_0$",r"${\rm log}_{10} (M_{\rm ej})$",r"$v_{\rm ej}$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
             n_params = len(parameters)
-            pymultinest.run(myloglike_bhns_ejecta, myprior_bhns_ejecta, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+            n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+            pymultinest.run(myloglike_bhns_ejecta, myprior_bhns_ejecta, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "BNS":
             parameters = ["t0","mej","vej","th","ph","zp"]
             labels = [r"$T_0$",r"${\rm log}_{10} (M_{\rm ej})$",r"$v_{\rm ej}$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
             n_params = len(parameters)
-            pymultinest.run(myloglike_bns_ejecta, myprior_bns_ejecta, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+            n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+            pymultinest.run(myloglike_bns_ejecta, myprior_bns_ejecta, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "Blue":
             parameters = ["t0","mej","vej","beta","kappa_r","zp"]
             labels = [r"$T_0$",r"${\rm log}_{10} (M_{\rm ej})$",r"$v_{\rm ej}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
             n_params = len(parameters)
-            pymultinest.run(myloglike_blue_ejecta, myprior_blue_ejecta, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+            n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+            pymultinest.run(myloglike_blue_ejecta, myprior_blue_ejecta, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "Arnett":
             parameters = ["t0","mej","vej","beta","kappa_r","zp"]
             labels = [r"$T_0$",r"${\rm log}_{10} (M_{\rm ej})$",r"$v_{\rm ej}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
             n_params = len(parameters)
-            pymultinest.run(myloglike_arnett_ejecta, myprior_arnett_ejecta, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+            n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+            pymultinest.run(myloglike_arnett_ejecta, myprior_arnett_ejecta, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
     else:
         print "Enable --doEjecta or --doMasses"
         exit(0)
@@ -1113,10 +1149,14 @@ elif opts.model in ["SN"]:
     parameters = ["t0","z","x0","x1","c","zp"]
     labels = [r"$T_0$", r"$z$", r"$x_0$", r"$x_1$",r"$c$","ZP"]
     n_params = len(parameters)
+    n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
 
-    pymultinest.run(myloglike_sn, myprior_sn, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+    pymultinest.run(myloglike_sn, myprior_sn, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
 
 
+# the best fit light curves are plotted on the full time grid
+tmodel = None
+
 # lets analyse the results
 a = pymultinest.Analyzer(n_params = n_params, outputfiles_basename='%s/2-'%plotDir)
 s = a.get_stats()
@@ -1493,6 +1533,11 @@ elif opts.model == "SN":
 
     tmag, lbol, mag = sn_model(z_best,0.0,x0_best,x1_best,c_best)
 
+if opts.doMarginalizeZP:
+    # the zp column holds draws from the conditional posterior, so the best
+    # fit uses the maximum likelihood zp of the best fit model instead
+    zp_best = lightcurve_likelihood.calc_zpbest(likelihood,tmag,lbol,mag,t0_best)
+
 truths = get_truths(opts.name,opts.model)
 
 if n_params >= 8:
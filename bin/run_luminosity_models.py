@@ -16,7 +16,8 @@ import corner
 
 import pymultinest
 from gwemlightcurves import BHNSKilonovaLightcurve, BNSKilonovaLightcurve, SALT2, BlueKilonovaLightcurve, ArnettKilonovaLightcurve
-from gwemlightcurves import lightcurve_utils
+from gwemlightcurves import lightcurve_utils, lightcurve_likelihood
+from gwemlightcurves.universal_relations import EOSfit
 
 def parse_commandline():
     """
@@ -39,6 +40,7 @@ def parse_commandline():
     parser.add_option("--doMassGap",  action="store_true", default=False)
     parser.add_option("--doReduced",  action="store_true", default=False)
     parser.add_option("--doFixZPT0",  action="store_true", default=False) 
+    parser.add_option("--doMarginalizeZP",  action="store_true", default=False)
     parser.add_option("--doEOSFit",  action="store_true", default=False)
     parser.add_option("-m","--model",default="BHNS")
     parser.add_option("--doMasses",  action="store_true", default=False)
@@ -257,13 +259,23 @@ def myprior_bhns_EOSFit(cube, ndim, nparams):
         cube[6] = cube[6]*2*np.pi
         cube[7] = cube[7]*2*ZPRange - ZPRange
 
-def prior_bns(m1,mb1,c1,m2,mb2,c2):
+def prior_bns(m1,mb1,c1,m2,mb2,c2,calc_meje=None):
         if m1 < m2:
             return 0.0
-        else:
-            return 1.0
+        # baryonic masses exceed the gravitational ones, and for a common
+        # EOS the heavier star is the more compact one
+        if (mb1 < m1) or (mb2 < m2) or (c1 < c2):
+            return 0.0
+        # without ejecta there is no kilonova to compare with
+        if (calc_meje is not None) and (not calc_meje(m1,mb1,c1,m2,mb2,c2) > 0.0):
+            return 0.0
+        return 1.0
 
-def prior_bhns(q,chi_eff,mns,mb,c):
+def prior_bhns(q,chi_eff,mns,mb,c,calc_meje=None):
+        if mb < mns:
+            return 0.0
+        if (calc_meje is not None) and (not calc_meje(q,chi_eff,c,mb,mns) > 0.0):
+            return 0.0
         return 1.0
 
 def myprior_blue(cube, ndim, nparams):
@@ -412,12 +424,13 @@ def myloglike_blue(cube, ndim, nparams):
         kappa_r = 10**cube[8]
         zp = cube[9]
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BlueKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = blue_model(m1,mb1,c1,m2,mb2,c2,beta,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -434,12 +447,13 @@ def myloglike_arnett(cube, ndim, nparams):
         kappa_r = 10**cube[8]
         zp = cube[9]
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,ArnettKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = arnett_model(m1,mb1,c1,m2,mb2,c2,slope_r,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -453,7 +467,7 @@ def myloglike_blue_ejecta(cube, ndim, nparams):
 
         tmag, lbol, mag = blue_model_ejecta(mej,vej,beta,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -467,7 +481,7 @@ def myloglike_arnett_ejecta(cube, ndim, nparams):
 
         tmag, lbol, mag = arnett_model_ejecta(mej,vej,slope_r,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -485,12 +499,13 @@ def myloglike_blue_EOSFit(cube, ndim, nparams):
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BlueKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = blue_model(m1,mb1,c1,m2,mb2,c2,beta,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
     
@@ -508,12 +523,13 @@ def myloglike_arnett_EOSFit(cube, ndim, nparams):
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,ArnettKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = arnett_model(m1,mb1,c1,m2,mb2,c2,slope_r,kappa_r)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -530,12 +546,13 @@ def myloglike_bns(cube, ndim, nparams):
         ph = cube[8]
         zp = cube[9]
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = bns_model(m1,mb1,c1,m2,mb2,c2,th,ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -549,7 +566,7 @@ def myloglike_bns_ejecta(cube, ndim, nparams):
 
         tmag, lbol, mag = bns_model_ejecta(mej,vej,th,ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -567,12 +584,13 @@ def myloglike_bns_EOSFit(cube, ndim, nparams):
         mb1 = EOSfit(m1,c1)
         mb2 = EOSfit(m2,c2)
 
+        prior = prior_bns(m1,mb1,c1,m2,mb2,c2,BNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = bns_model(m1,mb1,c1,m2,mb2,c2,th,ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bns(m1,mb1,c1,m2,mb2,c2)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -587,12 +605,13 @@ def myloglike_bhns(cube, ndim, nparams):
         ph = cube[7]
         zp = cube[8]
 
+        prior = prior_bhns(q,chi_eff,mns,mb,c,BHNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = bhns_model(q, chi_eff, mns, mb, c, th, ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bhns(q,chi_eff,mns,mb,c)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -606,7 +625,7 @@ def myloglike_bhns_ejecta(cube, ndim, nparams):
 
         tmag, lbol, mag = bhns_model_ejecta(mej,vej,th,ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -622,12 +641,13 @@ def myloglike_bhns_EOSFit(cube, ndim, nparams):
 
         mb = EOSfit(mns,c)
 
+        prior = prior_bhns(q,chi_eff,mns,mb,c,BHNSKilonovaLightcurve.calc_meje)
+        if prior == 0.0:
+            return -np.inf
+
         tmag, lbol, mag = bhns_model(q, chi_eff, mns, mb, c, th, ph)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
-        prior = prior_bhns(q,chi_eff,mns,mb,c)
-        if prior == 0.0:
-            prob = -np.inf
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
@@ -648,70 +668,13 @@ def myloglike_sn(cube, ndim, nparams):
 
         tmag, lbol, mag = sn_model(z, 0.0 ,x0,x1,c)
 
-        prob = calc_prob(tmag, lbol, mag, t0, zp)
+        prob, cube[nparams-1] = calc_prob(tmag, lbol, mag, t0, zp)
 
         return prob
 
 def calc_prob(tmag, lbol, mag, t0, zp): 
 
-        if np.sum(lbol) == 0.0:
-            prob = -np.inf
-            return prob
-        tmag = tmag + t0
-
-        count = 0
-        chisquare = np.nan
-
-        t = data_out["tt"]
-        y = data_out["Lbol"]
-        sigma_y = data_out["Lbol_err"]
-
-        idx = np.where(~np.isnan(y))[0]
-        t = t[idx]
-        y = y[idx]
-        sigma_y = sigma_y[idx]
-
-        ii = np.where(~np.isnan(lbol))[0]
-        if len(ii) == 0:
-            lbolinterp = np.nan*np.ones(t.shape)
-        else:
-            f = interp.interp1d(tmag[ii], np.log10(lbol[ii]), fill_value='extrapolate')
-            lbolinterp = 10**f(t)
-
-        zp_factor = 10**(zp/-2.5)
-        lbolinterp = lbolinterp*zp_factor
-
-        sigma_y = np.abs(sigma_y/(y*np.log(10)))
-        sigma = np.sqrt((np.log10(1+errorbudget))**2 + sigma_y**2)
-        y = np.log10(y)
-        lbolinterp = np.log10(lbolinterp)
-
-        chisquarevals = ((y-lbolinterp)/sigma)**2
-
-        chisquaresum = np.sum(chisquarevals)
-        if np.isnan(chisquaresum):
-            chisquare = np.nan
-            return chisquare
-
-        if not float(len(chisquarevals)-1) == 0:
-            chisquaresum = (1/float(len(chisquarevals)-1))*chisquaresum
-
-        chisquare = chisquaresum
-
-        if np.isnan(chisquare): 
-            prob = -np.inf
-        else:
-            #prob = scipy.stats.chi2.logpdf(chisquare, count, loc=0, scale=1)
-            #prob = -chisquare/2.0
-            #prob = chisquare
-            prob = scipy.stats.chi2.logpdf(chisquare, 1, loc=0, scale=1)
-
-        if np.isnan(prob):
-            prob = -np.inf
-
-        #if np.isfinite(prob):
-        #    print t0, zp, prob
-        return prob
+        return lightcurve_likelihood.calc_prob_lbol(likelihood, tmag, lbol, t0, zp)
 
 def get_truths(name,model):
     truths = []
@@ -754,10 +717,6 @@ def get_truths(name,model):
         truths = [0,np.log10(0.0079), 0.12,False,False,False]
     return truths
 
-def EOSfit(mns,c):
-    mb = mns*(1 + 0.8857853174243745*c**1.2082383572002926)
-    return mb
-
 # Parse command line
 opts = parse_commandline()
 
@@ -772,6 +731,11 @@ else:
     ZPRange = 50.0
     T0Range = 5.0
 
+if opts.doMarginalizeZP and opts.doFixZPT0:
+    # the analytic zp marginalization assumes a wide zp prior
+    print "--doMarginalizeZP and --doFixZPT0 are exclusive"
+    exit(0)
+
 baseplotDir = opts.plotDir
 if opts.doModels:
     basename = 'models_luminosity'
@@ -940,6 +904,8 @@ else:
         fid.write('%.5f %.5f %.5f %.5f\n'%(np.nan,np.nan,np.nan,np.nan))
         fid.close()
 
+likelihood = lightcurve_likelihood.setup_lbol(data_out,errorbudget,zprange=ZPRange,marginalize=opts.doMarginalizeZP)
+
 if opts.model in ["BHNS","BNS","Blue","Arnett"]:
 
     if opts.doMasses:
@@ -948,66 +914,78 @@ if opts.model in ["BHNS","BNS","Blue","Arnett"]:
                 parameters = ["t0","q","chi_eff","mns","c","th","ph","zp"]
                 labels = [r"$T_0$",r"$q$",r"$\chi_{\rm eff}$",r"$M_{\rm ns}$",r"$C$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_bhns_EOSFit, myprior_bhns_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_bhns_EOSFit, myprior_bhns_EOSFit, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
             else:
                 parameters = ["t0","q","chi_eff","mns","mb","c","th","ph","zp"]
                 labels = [r"$T_0$",r"$q$",r"$\chi_{\rm eff}$",r"$M_{\rm ns}$",r"$M_{\rm b}$",r"$C$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_bhns, myprior_bhns, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_bhns, myprior_bhns, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "BNS":
             if opts.doEOSFit:
                 parameters = ["t0","m1","c1","m2","c2","th","ph","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$C_{\rm 2}$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_bns_EOSFit, myprior_bns_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_bns_EOSFit, myprior_bns_EOSFit, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
             else:
                 parameters = ["t0","m1","mb1","c1","m2","mb2","c2","th","ph","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$M_{\rm b1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$M_{\rm b2}$",r"$C_{\rm 2}$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_bns, myprior_bns, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_bns, myprior_bns, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "Blue":
             if opts.doEOSFit:
                 parameters = ["t0","m1","c1","m2","c2","beta","kappa_r","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$C_{\rm 2}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_blue_EOSFit, myprior_blue_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_blue_EOSFit, myprior_blue_EOSFit, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
             else:
                 parameters = ["t0","m1","mb1","c1","m2","mb2","c2","beta","kappa_r","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$M_{\rm b1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$M_{\rm b2}$",r"$C_{\rm 2}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_blue, myprior_blue, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_blue, myprior_blue, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "Arnett":
             if opts.doEOSFit:
                 parameters = ["t0","m1","c1","m2","c2","beta","kappa_r","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$C_{\rm 2}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_arnett_EOSFit, myprior_arnett_EOSFit, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_arnett_EOSFit, myprior_arnett_EOSFit, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
             else:
                 parameters = ["t0","m1","mb1","c1","m2","mb2","c2","beta","kappa_r","zp"]
                 labels = [r"$T_0$",r"$M_{\rm 1}$",r"$M_{\rm b1}$",r"$C_{\rm 1}$",r"$M_{\rm 2}$",r"$M_{\rm b2}$",r"$C_{\rm 2}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
                 n_params = len(parameters)
-                pymultinest.run(myloglike_arnett, myprior_arnett, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+                n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+                pymultinest.run(myloglike_arnett, myprior_arnett, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
     elif opts.doEjecta:
         if opts.model == "BHNS":
             parameters = ["t0","mej","vej","th","ph","zp"]
             labels = [r"$T_0$",r"${\rm log}_{10} (M_{\rm ej})$",r"$v_{\rm ej}$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
             n_params = len(parameters)
-            pymultinest.run(myloglike_bhns_ejecta, myprior_bhns_ejecta, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+            n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+            pymultinest.run(myloglike_bhns_ejecta, myprior_bhns_ejecta, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "BNS":
             parameters = ["t0","mej","vej","th","ph","zp"]
             labels = [r"$T_0$",r"${\rm log}_{10} (M_{\rm ej})$",r"$v_{\rm ej}$",r"$\theta_{\rm ej}$",r"$\phi_{\rm ej}$","ZP"]
             n_params = len(parameters)
-            pymultinest.run(myloglike_bns_ejecta, myprior_bns_ejecta, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+            n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+            pymultinest.run(myloglike_bns_ejecta, myprior_bns_ejecta, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "Blue":
             parameters = ["t0","mej","vej","beta","kappa_r","zp"]
             labels = [r"$T_0$",r"${\rm log}_{10} (M_{\rm ej})$",r"$v_{\rm ej}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
             n_params = len(parameters)
-            pymultinest.run(myloglike_blue_ejecta, myprior_blue_ejecta, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+            n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+            pymultinest.run(myloglike_blue_ejecta, myprior_blue_ejecta, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
         elif opts.model == "Arnett":
             parameters = ["t0","mej","vej","beta","kappa_r","zp"]
             labels = [r"$T_0$",r"${\rm log}_{10} (M_{\rm ej})$",r"$v_{\rm ej}$",r"$\beta$",r"${\rm log}_{10} \kappa_{\rm r}$","ZP"]
             n_params = len(parameters)
-            pymultinest.run(myloglike_arnett_ejecta, myprior_arnett_ejecta, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+            n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
+            pymultinest.run(myloglike_arnett_ejecta, myprior_arnett_ejecta, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
     else:
         print "Enable --doEjecta or --doMasses"
         exit(0)
@@ -1017,8 +995,9 @@ elif opts.model in ["SN"]:
     parameters = ["t0","z","x0","x1","c","zp"]
     labels = [r"$T_0$", r"$z$", r"$x_0$", r"$x_1$",r"$c$","ZP"]
     n_params = len(parameters)
+    n_dims = n_params - 1 if opts.doMarginalizeZP else n_params
 
-    pymultinest.run(myloglike_sn, myprior_sn, n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
+    pymultinest.run(myloglike_sn, myprior_sn, n_dims, n_params = n_params, importance_nested_sampling = False, resume = True, verbose = True, sampling_efficiency = 'parameter', n_live_points = n_live_points, outputfiles_basename='%s/2-'%plotDir, evidence_tolerance = evidence_tolerance, multimodal = False)
 
 
 # lets analyse the results
@@ -1397,6 +1376,11 @@ elif opts.model == "SN":
 
     tmag, lbol, mag = sn_model(z_best,0.0,x0_best,x1_best,c_best)
 
+if opts.doMarginalizeZP:
+    # the zp column holds draws from the conditional posterior, so the best
+    # fit uses the maximum likelihood zp of the best fit model instead
+    zp_best = lightcurve_likelihood.calc_zpbest_lbol(likelihood,tmag,lbol,t0_best)
+
 truths = get_truths(opts.name,opts.model)
 
 if n_params >= 8:
@@ -0,0 +1,59 @@
+import os, sys
+import optparse
+import numpy as np
+
+from gwemlightcurves import lightcurve_emulator
+
+def parse_commandline():
+    """
+    Parse the options given on the command-line.
+    """
+    parser = optparse.OptionParser()
+
+    parser.add_option("-e","--emulatorDir",default="../emulators")
+    parser.add_option("-m","--model",default="Blue")
+    parser.add_option("-n","--nprocs",default=1,type=int)
+    parser.add_option("--ntrain",default=500,type=int)
+    parser.add_option("--ntest",default=200,type=int)
+    parser.add_option("--ncomponents",default=10,type=int)
+    parser.add_option("--seed",default=1,type=int)
+    parser.add_option("--tmin",default=0.1,type=float)
+    parser.add_option("--tmax",default=50.0,type=float)
+    parser.add_option("--dt",default=0.1,type=float)
+    # per-parameter training range as min,max, e.g. --mej 1e-3,0.1
+    for model in lightcurve_emulator.EMULATOR_MODELS.itervalues():
+        for param in model:
+            if not parser.has_option("--%s"%param[0]):
+                parser.add_option("--%s"%param[0],default=None)
+
+    opts, args = parser.parse_args()
+
+    return opts
+
+# Parse command line
+opts = parse_commandline()
+
+if not opts.model in lightcurve_emulator.EMULATOR_MODELS:
+   print "Model must be either: %s"%(", ".join(sorted(lightcurve_emulator.EMULATOR_MODELS.keys())))
+   exit(0)
+
+ranges = []
+for name, scale, pmin, pmax in lightcurve_emulator.EMULATOR_MODELS[opts.model]:
+    value = getattr(opts,name)
+    if value is not None:
+        pmin, pmax = [float(x) for x in value.split(",")]
+    ranges.append((pmin,pmax))
+
+emulatorDir = opts.emulatorDir
+if not os.path.isdir(emulatorDir):
+    os.makedirs(emulatorDir)
+
+print "Training %s emulator on %d light curves..."%(opts.model,opts.ntrain)
+emulator = lightcurve_emulator.train_emulator(opts.model,ntrain=opts.ntrain,ntest=opts.ntest,ncomponents=opts.ncomponents,ranges=ranges,tini=opts.tmin,tmax=opts.tmax,dt=opts.dt,nprocs=opts.nprocs,seed=opts.seed)
+
+keyslist = ["u","g","r","i","z","y","J","H","K","lbol"]
+print "Validation RMS: %s"%(", ".join(["%s %.3f"%(key,rms) for key,rms in zip(keyslist,emulator["rms"])]))
+
+filename = os.path.join(emulatorDir,"%s.npz"%opts.model)
+lightcurve_emulator.save_emulator(filename,emulator)
+print "Wrote %s"%filename
@@ -0,0 +1,61 @@
+import os, sys
+import optparse
+import numpy as np
+
+from gwemlightcurves import lightcurve_grid
+
+def parse_commandline():
+    """
+    Parse the options given on the command-line.
+    """
+    parser = optparse.OptionParser()
+
+    parser.add_option("-g","--gridDir",default="../grids")
+    parser.add_option("-m","--model",default="BNS")
+    parser.add_option("-n","--nprocs",default=1,type=int)
+    parser.add_option("--tmin",default=0.1,type=float)
+    parser.add_option("--tmax",default=50.0,type=float)
+    parser.add_option("--dt",default=0.1,type=float)
+    # random points at which the interpolation error is measured
+    parser.add_option("--nvalidate",default=200,type=int)
+    # per-parameter grid as min,max,npoints, e.g. --mej 1e-5,1,21
+    for model in lightcurve_grid.GRID_MODELS.itervalues():
+        for param in model:
+            if not parser.has_option("--%s"%param[0]):
+                parser.add_option("--%s"%param[0],default=None)
+
+    opts, args = parser.parse_args()
+
+    return opts
+
+# Parse command line
+opts = parse_commandline()
+
+if not opts.model in lightcurve_grid.GRID_MODELS:
+   print "Model must be either: %s"%(", ".join(sorted(lightcurve_grid.GRID_MODELS.keys())))
+   exit(0)
+
+axes = lightcurve_grid.default_axes(opts.model)
+for ii, (name, scale, pmin, pmax, npoints) in enumerate(lightcurve_grid.GRID_MODELS[opts.model]):
+    value = getattr(opts,name)
+    if value is None:
+        continue
+    pmin, pmax, npoints = value.split(",")
+    if scale == "log":
+        axes[ii] = np.logspace(np.log10(float(pmin)),np.log10(float(pmax)),int(npoints))
+    else:
+        axes[ii] = np.linspace(float(pmin),float(pmax),int(npoints))
+
+gridDir = opts.gridDir
+if not os.path.isdir(gridDir):
+    os.makedirs(gridDir)
+
+print "Computing %s grid of %s points..."%(opts.model," x ".join([str(len(axis)) for axis in axes]))
+grid = lightcurve_grid.calc_grid(opts.model,axes=axes,tini=opts.tmin,tmax=opts.tmax,dt=opts.dt,nprocs=opts.nprocs,nvalidate=opts.nvalidate)
+if opts.nvalidate > 0:
+    keyslist = ["u","g","r","i","z","y","J","H","K","lbol"]
+    print "Validation RMS: %s"%(", ".join(["%s %.3f"%(key,rms) for key,rms in zip(keyslist,grid["rms"])]))
+
+filename = os.path.join(gridDir,"%s.npz"%opts.model)
+lightcurve_grid.save_grid(filename,grid)
+print "Wrote %s"%filename
@@ -14,6 +14,7 @@ from matplotlib.pyplot import cm
 
 from gwemlightcurves import BNSKilonovaLightcurve, BHNSKilonovaLightcurve, BlueKilonovaLightcurve, ArnettKilonovaLightcurve, SALT2
 from gwemlightcurves import lightcurve_utils
+from gwemlightcurves.universal_relations import CLove, EOSfit, tidal_lambda_from_tilde
 
 def parse_commandline():
     """
@@ -73,77 +74,6 @@ def arnett_model(m1,mb1,c1,m2,mb2,c2):
 
     return mej, vej
 
-# Equation to relate EOS and neutron star mass to Baryonic mass
-# Eq 8: https://arxiv.org/pdf/1708.07714.pdf
-
-def EOSfit(mns,c):
-    mb = mns*(1 + 0.8857853174243745*c**1.2082383572002926)
-    return mb
-
-# Give the compactness-Love and Love-compactness relations
-# NKJ-M, 08.2017
-
-
-def CLove(lmbda):
-    """
-    Compactness-Love relation for neutron stars from Eq. (78) of Yagi and Yunes, Phys. Rep. 681, 1 (2017), using the YY coefficients and capping the compactness at the Buchdahl limit of 4/9 = 0.44... (since the fit diverges as lambda \to 0). We also cap the compactness at zero, since it becomes negative for large lambda, though these lambdas are so large that they are unlikely to be encountered in practice. In both cases, we raise an error if it runs up against either of the bounds.
-
-    Input: Dimensionless quadrupolar tidal deformability lmbda
-    Output: Compactness (mass over radius, in geometrized units, so the result is dimensionless)
-    """
-
-    # Give coefficients
-    a0 = 0.360
-    a1 = -0.0355
-    a2 = 0.000705
-
-    # Compute fit
-    lmbda = np.atleast_1d(lmbda)
-    ll = np.log(lmbda)
-    cc = a0 + (a1 + a2*ll)*ll
-  
-    if (cc > 4./9.).any():
-        print("Warning: Returned compactnesses > 4/9 = 0.44 ... setting = 4/9")
-        cc[cc > 4./9.] = 4./9.
-    if (cc < 0.).any(): 
-        print("Warning: Returned compactnesses < 0 ... setting = 0.")
-        cc[cc < 0.0] = 0.0
-
-    return cc
-
-def LoveC(cc):
-    """
-    Invert the compactness-Love relation given above.
-    """
-    # Give coefficients
-    a0 = 0.360
-    a1 = -0.0355
-    a2 = 0.000705
-    ll = -(a1 + (a1*a1 - 4.*a2*(a0 - cc))**0.5)/(2.*a2)
-
-    return np.exp(ll)
-
-# See Eqs. 5 and 6 from
-# https://journals.aps.org/prd/pdf/10.1103/PhysRevD.89.103012
-
-def tidal_lambda_from_tilde(mass1, mass2, lam_til, dlam_til):
-    """
-    Determine physical lambda parameters from effective parameters.
-    """
-    mt = mass1 + mass2
-    eta = mass1 * mass2 / mt**2
-    q = np.sqrt(1 - 4*eta)
-
-    a = (8./13) * (1 + 7*eta - 31*eta**2)
-    b = (8./13) * q * (1 + 9*eta - 11*eta**2)
-    c = 0.5 * q * (1 - 13272*eta/1319 + 8944*eta**2/1319)
-    d = 0.5 * (1 - 15910*eta/1319 + 32850*eta**2/1319 + 3380*eta**3/1319)
-
-    lambda1 = 0.5 * ((c - d) * lam_til - (a - b) * dlam_til)/(b*c - a*d)
-    lambda2 = 0.5 * ((c + d) * lam_til - (a + b) * dlam_til)/(a*d - b*c)
-
-    return lambda1, lambda2
-
 # Parse command line
 opts = parse_commandline()
 
@@ -244,12 +174,23 @@ for model in models:
         mag_all[model][filt] = np.empty((0,len(tt)))
 
 for model in models:
-    for m1, m2, c1, c2, mb1, mb2 in zip(data_out_all[model]["m1"],data_out_all[model]["m2"],data_out_all[model]["c1"],data_out_all[model]["c2"],data_out_all[model]["mb1"],data_out_all[model]["mb2"]):
-        if model == "BHNS":
-            q = m1/m2
-            t, lbol, mag = BHNSKilonovaLightcurve.lightcurve(tini,tmax,dt,vmin,th,ph,kappa,eps,alp,eth,q,chi_eff,c1,mb2,m2)
-        elif model == "BNS":
-            t, lbol, mag = BNSKilonovaLightcurve.lightcurve(tini,tmax,dt,vmin,th,ph,kappa,eps,alp,eth,m1,mb1,c1,m2,mb2,c2,flgbct)
+    # the BNS and BHNS light curves of all samples in one batched call
+    m1s, m2s = np.asarray(data_out_all[model]["m1"]), np.asarray(data_out_all[model]["m2"])
+    c1s, c2s = np.asarray(data_out_all[model]["c1"]), np.asarray(data_out_all[model]["c2"])
+    mb1s, mb2s = np.asarray(data_out_all[model]["mb1"]), np.asarray(data_out_all[model]["mb2"])
+    if model == "BHNS":
+        qs = m1s/m2s
+        mejs = BHNSKilonovaLightcurve.calc_meje(qs,chi_eff,c1s,mb2s,m2s)
+        vejs = BHNSKilonovaLightcurve.calc_vave(qs)
+        t, lbols, mags = BHNSKilonovaLightcurve.calc_lc_batch(tini,tmax,dt,mejs,vejs,vmin,th,ph,kappa,eps,alp,eth)
+    elif model == "BNS":
+        mejs = BNSKilonovaLightcurve.calc_meje(m1s,mb1s,c1s,m2s,mb2s,c2s)
+        vejs = BNSKilonovaLightcurve.calc_vej(m1s,c1s,m2s,c2s)
+        t, lbols, mags = BNSKilonovaLightcurve.calc_lc_batch(tini,tmax,dt,mejs,vejs,vmin,th,ph,kappa,eps,alp,eth,flgbct)
+
+    for kk, (m1, m2, c1, c2, mb1, mb2) in enumerate(zip(m1s,m2s,c1s,c2s,mb1s,mb2s)):
+        if model in ["BHNS","BNS"]:
+            lbol, mag = lbols[kk], mags[kk]
         elif model == "Blue":
             t, lbol, mag, Tobs = BlueKilonovaLightcurve.lightcurve(tini,tmax,dt,beta,kappa_r,m1,mb1,c1,m2,mb2,c2)
         elif model == "Arnett":
@@ -10,6 +10,8 @@ matplotlib.use('Agg')
 matplotlib.rcParams.update({'font.size': 16})
 import matplotlib.pyplot as plt
 
+from gwemlightcurves import lightcurve_utils
+
 def parse_commandline():
     """
     Parse the options given on the command-line.
@@ -23,29 +25,6 @@ def parse_commandline():
 
     return opts
 
-def loadLightcurves(filename):
-    lines = [line.rstrip('\n') for line in open(filename)]
-    lines = lines[1:]
-    lines = filter(None,lines)
-    
-    data = {}
-    for line in lines:
-        lineSplit = line.split(" ")
-        numid = float(lineSplit[0])
-        psid = lineSplit[1]
-        filt = lineSplit[2]
-        mjd = float(lineSplit[3])
-        mag = float(lineSplit[4])
-        dmag = float(lineSplit[5])
-    
-        if not psid in data:
-            data[psid] = {}
-        if not filt in data[psid]:
-            data[psid][filt] = np.empty((0,3), float)
-        data[psid][filt] = np.append(data[psid][filt],np.array([[mjd,mag,dmag]]),axis=0)
-
-    return data
-
 # Parse command line
 opts = parse_commandline()
 dataDir = opts.dataDir
@@ -54,7 +33,7 @@ if opts.doGWs:
     filename = "%s/lightcurves_gw.tmp"%dataDir
 else:
     filename = "%s/lightcurves.tmp"%dataDir
-data = loadLightcurves(filename)
+data = lightcurve_utils.loadLightcurves(filename)
 for name in data.iterkeys():
 
     data_out = data[name]
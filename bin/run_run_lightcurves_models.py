@@ -10,6 +10,8 @@ matplotlib.use('Agg')
 matplotlib.rcParams.update({'font.size': 16})
 import matplotlib.pyplot as plt
 
+from gwemlightcurves import lightcurve_store
+
 def parse_commandline():
     """
     Parse the options given on the command-line.
@@ -35,29 +37,6 @@ def parse_commandline():
 
     return opts
 
-def loadLightcurves(filename):
-    lines = [line.rstrip('\n') for line in open(filename)]
-    lines = lines[1:]
-    lines = filter(None,lines)
-    
-    data = {}
-    for line in lines:
-        lineSplit = line.split(" ")
-        numid = float(lineSplit[0])
-        psid = lineSplit[1]
-        filt = lineSplit[2]
-        mjd = float(lineSplit[3])
-        mag = float(lineSplit[4])
-        dmag = float(lineSplit[5])
-    
-        if not psid in data:
-            data[psid] = {}
-        if not filt in data[psid]:
-            data[psid][filt] = np.empty((0,3), float)
-        data[psid][filt] = np.append(data[psid][filt],np.array([[mjd,mag,dmag]]),axis=0)
-
-    return data
-
 # Parse command line
 opts = parse_commandline()
 
@@ -138,45 +117,47 @@ elif opts.doMassGap:
         os.system(system_call)
 
 else:
-    data = loadLightcurves(filename)
-    for name in data.iterkeys():
-
-        data_out = data[name]
-        mags = {}
-        shapes = {}
-        filters = []
-        for ii,key in enumerate(data_out.iterkeys()):
-            if ii == 0:
-                samples = data_out[key].copy()
+    # the children read their object from the store built here
+    store = lightcurve_store.open_store(filename)
+    for data in lightcurve_store.iter_objects(store):
+        for name in data.iterkeys():
+
+            data_out = data[name]
+            mags = {}
+            shapes = {}
+            filters = []
+            for ii,key in enumerate(data_out.iterkeys()):
+                if ii == 0:
+                    samples = data_out[key].copy()
+                else:
+                    samples = np.vstack((samples,data_out[key].copy()))
+                filters.append(key)
+
+                mags[key] = np.min(data_out[key][:,1])
+                F1 = data_out[key][0,1]
+                t1 = data_out[key][0,0]
+                F2 = data_out[key][-1,1]
+                t2 = data_out[key][-1,0]
+                shapes[key] = (1/F1)*((F2-F1)/(t2-t1))
+
+            tt = np.sort(samples[:,0])
+            ttmin = np.min(tt)
+            ttmax = np.max(tt)
+
+            ttdiff = ttmax - ttmin
+
+            cut10 = ttdiff <= 20
+            if not cut10: continue
+            cut0a = len(filters) > 1
+            if not cut0a: continue
+
+            plotDir = "plots/lightcurves_BHNS/%s"%name
+            filename = os.path.join(plotDir,'samples.dat')
+            if os.path.isfile(filename): continue
+
+            if opts.doGWs:
+                system_call = "python run_lightcurves_models.py --name %s --doGWs"%(name)
             else:
-                samples = np.vstack((samples,data_out[key].copy()))
-            filters.append(key)
-
-            mags[key] = np.min(data_out[key][:,1])
-            F1 = data_out[key][0,1]
-            t1 = data_out[key][0,0]
-            F2 = data_out[key][-1,1]
-            t2 = data_out[key][-1,0]
-            shapes[key] = (1/F1)*((F2-F1)/(t2-t1))
-
-        tt = np.sort(samples[:,0])
-        ttmin = np.min(tt)
-        ttmax = np.max(tt)
-
-        ttdiff = ttmax - ttmin
-
-        cut10 = ttdiff <= 20
-        if not cut10: continue
-        cut0a = len(filters) > 1
-        if not cut0a: continue
-
-        plotDir = "plots/lightcurves_BHNS/%s"%name
-        filename = os.path.join(plotDir,'samples.dat')
-        if os.path.isfile(filename): continue
-
-        if opts.doGWs:
-            system_call = "python run_lightcurves_models.py --name %s --doGWs"%(name)
-        else:
-            system_call = "python run_lightcurves_models.py --name %s"%(name)
-        os.system(system_call)
+                system_call = "python run_lightcurves_models.py --name %s"%(name)
+            os.system(system_call)
 
@@ -1,12 +1,20 @@
 
 import os, sys
+import hashlib, shutil, subprocess, tempfile
+import multiprocessing
 import numpy as np
 from scipy.interpolate import interpolate as interp
 import scipy
 
-def lightcurve(boxfitDir,tini,tmax,dt,theta_0,E,n,theta_obs,p,epsilon_B,epsilon_E,ksi_N):
+def lightcurve(boxfitDir,tini,tmax,dt,theta_0,E,n,theta_obs,p,epsilon_B,epsilon_E,ksi_N,njobs=1,ncores=None,cacheDir=None,doCache=True,tvec=None):
 
-    tt = np.arange(tini,tmax,dt)
+    # runs happen in temporary directories, so paths must be absolute
+    boxfitDir = os.path.abspath(boxfitDir)
+
+    if tvec is None:
+        tt = np.arange(tini,tmax,dt)
+    else:
+        tt = np.asarray(tvec,dtype=float)
     lbol = 1e43*np.ones(tt.shape)
 
     filts = ["u","g","r","i","z","y","J","H","K"]
@@ -14,10 +22,13 @@ def lightcurve(boxfitDir,tini,tmax,dt,theta_0,E,n,theta_obs,p,epsilon_B,epsilon_
     nu_0s = 3e8/lambdas
 
     exampleIni = "%s/boxfit.ini"%boxfitDir
-    mag = []
+    inis = []
     for filt, nu_0 in zip(filts,nu_0s):
         ini = []
         for line in open(exampleIni).readlines():
+             # BOXFit runs in a temporary directory, so paths relative to
+             # the current directory are made absolute
+             line = absolute_paths(line,os.getcwd())
              line = line.replace("xxx_boxfitDir",boxfitDir)
              line = line.replace("xxx_nu0","%.5e"%nu_0)
              line = line.replace("xxx_theta0","%.5f"%theta_0)
@@ -29,14 +40,14 @@ def lightcurve(boxfitDir,tini,tmax,dt,theta_0,E,n,theta_obs,p,epsilon_B,epsilon_
              line = line.replace("xxx_epsilon_E","%.5e"%epsilon_E)
              line = line.replace("xxx_ksi_N","%.5f"%ksi_N)
              ini.append(line)
-        paramFile = "boxfitsettings.txt" 
-        open(paramFile,'w').write("".join(ini))
-        system_command = "mpiexec %s/boxfit > %s/out"%(boxfitDir,boxfitDir)
-        os.system(system_command)
-
-        filename = "%s/out"%(boxfitDir)
-        data_out = np.loadtxt(filename,delimiter=",")
- 
+        inis.append("".join(ini))
+
+    if cacheDir is None:
+        cacheDir = os.path.join(boxfitDir,"cache")
+    data_outs = run_boxfit(boxfitDir,inis,njobs=njobs,ncores=ncores,cacheDir=cacheDir,doCache=doCache)
+
+    mag = []
+    for data_out in data_outs:
         t = data_out[:,1]/86400.0
         mJy = data_out[:,3]
         Jy = 1e-3 * mJy
@@ -50,4 +61,114 @@ def lightcurve(boxfitDir,tini,tmax,dt,theta_0,E,n,theta_obs,p,epsilon_B,epsilon_
 
     return tt, lbol, mag
 
+def run_boxfit(boxfitDir,inis,njobs=1,ncores=None,cacheDir=None,doCache=True):
+    """
+    Run BOXFit once per settings file content in inis and return the parsed
+    outputs in the same order.
+
+    Each run gets its own temporary working directory, so that runs never
+    share boxfitsettings.txt or the output file, and up to njobs runs
+    execute at once. A single job is started with a plain mpiexec, which
+    uses every MPI slot; with njobs > 1 the ncores cores (all by default)
+    are split between the jobs with mpiexec -n ncores/njobs, so that the
+    machine is not oversubscribed. With doCache, parsed outputs are stored
+    in cacheDir keyed by a hash of the settings, which hold the full
+    parameter set and the frequency, and are reused by later calls.
+    """
+
+    data_outs = [None]*len(inis)
+    keys = [hashlib.sha1(ini.encode('utf-8')).hexdigest() for ini in inis]
+
+    todo = []
+    for ii, key in enumerate(keys):
+        cacheFile = None
+        if doCache and cacheDir is not None:
+            cacheFile = os.path.join(cacheDir,"%s.npy"%key)
+            if os.path.isfile(cacheFile):
+                data_outs[ii] = np.load(cacheFile)
+                continue
+        todo.append((ii,cacheFile))
+
+    njobs = max(njobs,1)
+    command = ["mpiexec"]
+    if njobs > 1:
+        if ncores is None:
+            ncores = multiprocessing.cpu_count()
+        command = command + ["-n","%d"%max(ncores//njobs,1)]
+
+    for jj in xrange(0,len(todo),njobs):
+        jobs = []
+        for ii, cacheFile in todo[jj:jj+njobs]:
+            runDir = tempfile.mkdtemp(prefix="boxfit_")
+            open(os.path.join(runDir,"boxfitsettings.txt"),'w').write(inis[ii])
+            outFile = open(os.path.join(runDir,"out"),'w')
+            process = subprocess.Popen(command+["%s/boxfit"%boxfitDir],cwd=runDir,stdout=outFile)
+            jobs.append((ii,cacheFile,runDir,outFile,process))
+
+        for ii, cacheFile, runDir, outFile, process in jobs:
+            process.wait()
+            outFile.close()
+
+        try:
+            # only complete outputs of successful runs are cached
+            for ii, cacheFile, runDir, outFile, process in jobs:
+                outName = os.path.join(runDir,"out")
+                if not process.returncode == 0:
+                    raise RuntimeError("BOXFit failed with exit code %d:\n%s"%(process.returncode,"".join(open(outName).readlines()[-10:])))
+                try:
+                    data_out = np.atleast_2d(np.loadtxt(outName,delimiter=","))
+                except ValueError:
+                    data_out = np.empty((0,0))
+                if data_out.shape[0] == 0 or data_out.shape[1] < 4:
+                    raise RuntimeError("BOXFit output is incomplete:\n%s"%("".join(open(outName).readlines()[-10:])))
+                data_outs[ii] = data_out
+                if cacheFile is not None:
+                    save_cache(cacheFile,data_out)
+        finally:
+            for ii, cacheFile, runDir, outFile, process in jobs:
+                shutil.rmtree(runDir,ignore_errors=True)
+
+    return data_outs
+
+def absolute_paths(line,baseDir):
+    """
+    Settings line "name = value" with a value that is a path relative to
+    baseDir (an existing file or directory, or a file prefix within an
+    existing directory) replaced by the absolute path.
+    """
+
+    if not "=" in line:
+        return line
+    name, value = line.split("=",1)
+    path = value.strip()
+    if path == "" or os.path.isabs(path) or "xxx_" in path:
+        return line
+    try:
+        float(path)
+        return line
+    except ValueError:
+        pass
+
+    fullpath = os.path.join(baseDir,path)
+    if os.path.exists(fullpath) or (os.sep in path and os.path.isdir(os.path.dirname(fullpath))):
+        return "%s= %s\n"%(name,os.path.abspath(fullpath))
+    return line
+
+def save_cache(cacheFile,data_out):
+    """
+    Store a parsed BOXFit output in cacheFile. The array is written to a
+    temporary file and renamed, so that concurrent readers never see a
+    partial file.
+    """
+
+    cacheDir = os.path.dirname(cacheFile)
+    if not os.path.isdir(cacheDir):
+        try:
+            os.makedirs(cacheDir)
+        except OSError:
+            pass
 
+    fid, tmpFile = tempfile.mkstemp(dir=cacheDir,suffix=".npy")
+    os.close(fid)
+    np.save(tmpFile,data_out)
+    os.rename(tmpFile,cacheFile)
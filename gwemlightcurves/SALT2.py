@@ -2,21 +2,66 @@
 import numpy as np
 import sncosmo
 
-def lightcurve(tini,tmax,dt,z,t0,x0,x1,c):
-    model = sncosmo.Model(source='salt2')
+FILTERS = ['sdssu','sdssg','sdssr','sdssi','sdssz']
+
+# one sncosmo.Model per source and process; loading the templates dominates
+# the cost of a light curve, so the models are only re-parameterized
+_models = {}
+
+def get_model(source='salt2'):
+    """
+    Cached sncosmo.Model for source.
+    """
+
+    if not source in _models:
+        _models[source] = sncosmo.Model(source=source)
+    return _models[source]
+
+def lightcurve(tini,tmax,dt,z,t0,x0,x1,c,tvec=None):
+    model = get_model('salt2')
     model.set(z=z, t0=t0, x0=x0,x1=x1,c=c)
-    t = np.arange(tini,tmax+dt,dt)
-    mag = np.nan*np.ones((5,len(t)))
+    if tvec is None:
+        t = np.arange(tini,tmax+dt,dt)
+    else:
+        t = np.asarray(tvec,dtype=float)
     lbol = np.nan*np.ones((len(t),))
 
-    filters = ['sdssu','sdssg','sdssr','sdssi','sdssz']
-    for i, filt in enumerate(filters):
-        #mag[i,:] = model.bandmag(filt, 'ab', t)
-        try:
-            mag[i,:] = model.bandmag(filt, 'ab', t)
-            lbol = model.bandflux(filt,t)
-        except:
-            continue 
+    mag = calc_mags(model,FILTERS,t)
+    idx = [ii for ii, filt in enumerate(FILTERS) if in_range(model,filt)]
+    if len(idx) > 0:
+        lbol = model.bandflux(FILTERS[idx[-1]],t)
 
     return t, lbol, mag
 
+def calc_mags(model,filters,t):
+    """
+    AB magnitudes of model in filters at times t, as a (len(filters),
+    len(t)) array, evaluated in a single sncosmo call. Filters outside the
+    (redshifted) wavelength range of the model are NaN.
+    """
+
+    mag = np.nan*np.ones((len(filters),len(t)))
+    idx = [ii for ii, filt in enumerate(filters) if in_range(model,filt)]
+    if len(idx) == 0:
+        return mag
+
+    bands = np.repeat([filters[ii] for ii in idx],len(t))
+    times = np.tile(t,len(idx))
+    try:
+        mag[idx,:] = np.reshape(model.bandmag(bands,'ab',times),(len(idx),len(t)))
+    except:
+        for ii in idx:
+            try:
+                mag[ii,:] = model.bandmag(filters[ii],'ab',t)
+            except:
+                continue
+
+    return mag
+
+def in_range(model,filt):
+    """
+    Whether the bandpass filt lies within the wavelength range of model.
+    """
+
+    band = sncosmo.get_bandpass(filt)
+    return (band.minwave() >= model.minwave()) and (band.maxwave() <= model.maxwave())
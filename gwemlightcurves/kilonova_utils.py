@@ -0,0 +1,152 @@
+# Shared helpers for the Kawaguchi et al. / Dietrich et al. kilonova engines
+# (BNSKilonovaLightcurve, BHNSKilonovaLightcurve, BHNSKilonovaLightcurveOpt)
+
+import os, glob
+import numpy as np
+
+# effective wavelengths (Angstrom) of the u, g, r, i, z, J, H, K corrections
+# and of the y band, which is interpolated between z and J
+WAVELENGTHS = [3543, 4775.6, 6129.5, 7484.6, 8657.8, 12350, 16620, 21590]
+WAVELENGTH_Y = 9603.1
+
+# largest number of (sample, band, time) elements the batch engines hold at once
+BATCH_MAXSIZE = 2**22
+
+# bolometric-correction tables, one directory of .npy arrays per table
+BCDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),'data','bc')
+_bc_tables = {}
+
+def bc_table_names():
+    """
+    Names of the bolometric-correction tables shipped in BCDIR.
+    """
+    return sorted([name for name in os.listdir(BCDIR) if os.path.isdir(os.path.join(BCDIR,name))])
+
+def get_bc_table(name):
+    """
+    Bolometric-correction table BCDIR/<name> as a dict of arrays keyed by
+    file name (e.g. td, bct).
+
+    The arrays are memory-mapped read-only on first use and cached for the
+    lifetime of the process, so worker processes share the same pages.
+    """
+
+    if not name in _bc_tables:
+        tabledir = os.path.join(BCDIR,name)
+        if not os.path.isdir(tabledir):
+            raise ValueError("Unknown bolometric-correction table %s, available: %s"%(name,", ".join(bc_table_names())))
+
+        table = {}
+        for filename in glob.glob(os.path.join(tabledir,'*.npy')):
+            key = os.path.basename(filename)[:-len('.npy')]
+            table[key] = np.asarray(np.load(filename,mmap_mode='r'))
+        _bc_tables[name] = table
+
+    return _bc_tables[name]
+
+def calc_times(tini,tmax,dt,tvec=None):
+    """
+    Time grid matching repeated t=t+dt stepping from tini while t < tmax,
+    or the times tvec (days) when given.
+    """
+    if tvec is not None:
+        return np.asarray(tvec,dtype=float)
+    nsteps = int(np.ceil((tmax-tini)/dt))+2
+    if nsteps < 1:
+        return np.array([])
+    steps = dt*np.ones((nsteps,))
+    steps[0] = tini
+    t_d = np.cumsum(steps)
+
+    return t_d[t_d < tmax]
+
+def getBC_tabular(td,bct,tt):
+    """
+    Linearly interpolate tabulated bolometric corrections.
+
+    td is the sorted rescaled time table and bct the (n_bands, len(td))
+    corrections. Returns an (len(tt), n_bands) array, NaN where tt lies
+    outside the table or the interpolated value is not finite.
+    """
+
+    tt = np.atleast_1d(tt)
+    nbands = len(bct)
+    bc_tmp = np.nan*np.ones((len(tt),nbands))
+
+    idx = np.where((tt>=td[0]) & (tt<=td[-1]))[0]
+    ii = np.searchsorted(td,tt[idx],side='left')-1
+    ii[ii<0] = 0
+    fac = (tt[idx]-td[ii])/(td[ii+1]-td[ii])
+    for jj in xrange(nbands):
+        bc_tmp[idx,jj] = (1-fac)*bct[jj][ii]+fac*bct[jj][ii+1]
+
+    bc_tmp[~np.isfinite(bc_tmp)] = np.nan
+
+    return bc_tmp
+
+def getBC_polynomial(bc,tt,ttmin,ttmax,ttmax_bands=None):
+    """
+    Evaluate polynomial bolometric corrections.
+
+    bc holds the (n_bands, n_coeffs) polynomial coefficients in increasing
+    order. Returns an (len(tt), n_bands) array, NaN outside [ttmin, ttmax]
+    and beyond the optional per-band upper limits in ttmax_bands.
+    """
+
+    tt = np.atleast_1d(tt)
+    nbands = len(bc)
+    bc_tmp = np.nan*np.ones((len(tt),nbands))
+
+    idx = np.where((tt>=ttmin) & (tt<=ttmax))[0]
+    ttidx = tt[idx]
+    for jj in xrange(nbands):
+        bc_tmp[idx,jj] = bc[jj][0]
+        for kk in xrange(1,len(bc[jj])):
+            bc_tmp[idx,jj] = bc_tmp[idx,jj]+bc[jj][kk]*(ttidx**float(kk))
+    if ttmax_bands is None:
+        ttmax_bands = {}
+    for jj in ttmax_bands:
+        bc_tmp[tt>ttmax_bands[jj],jj] = np.nan
+
+    bc_tmp[~np.isfinite(bc_tmp)] = np.nan
+
+    return bc_tmp
+
+def calc_mags(t_d,mbol,bc_d,tcut):
+    """
+    Band magnitudes from bolometric magnitudes and corrections.
+
+    mbol has shape (..., n_times) and bc_d (..., n_times, n_bands) with the
+    first eight bands in WAVELENGTHS order. Magnitudes at times t_d <= tcut
+    are NaN. Returns an (..., 9, n_times) array in u, g, r, i, z, y, J, H, K
+    order.
+    """
+
+    mag_d = mbol[...,np.newaxis] - bc_d[...,:8]
+    mag_d[np.broadcast_to(t_d <= tcut,mag_d.shape[:-1])] = np.nan
+    mag_d = np.swapaxes(mag_d,-1,-2)
+
+    # linear interpolation between the bracketing z and J bands
+    jj = np.searchsorted(WAVELENGTHS,WAVELENGTH_Y)-1
+    slope = (mag_d[...,jj+1,:]-mag_d[...,jj,:])/(WAVELENGTHS[jj+1]-WAVELENGTHS[jj])
+    mag_y = slope*(WAVELENGTH_Y-WAVELENGTHS[jj]) + mag_d[...,jj,:]
+
+    return np.concatenate((mag_d[...,:jj+1,:],mag_y[...,np.newaxis,:],mag_d[...,jj+1:,:]),axis=-2)
+
+def broadcast_params(*params):
+    """
+    Broadcast scalar or length-N parameters to a list of (N, 1) columns.
+    """
+
+    params = np.broadcast_arrays(*[np.atleast_1d(np.asarray(param,dtype=float)) for param in params])
+    return [param.reshape((-1,1)) for param in params]
+
+def batch_chunks(nsamples,size,maxsize=BATCH_MAXSIZE):
+    """
+    Slices over nsamples rows, each holding at most maxsize elements when
+    a single row holds size elements.
+    """
+
+    chunksize = max(int(maxsize//max(size,1)),1)
+    for start in xrange(0,nsamples,chunksize):
+        yield slice(start,min(start+chunksize,nsamples))
@@ -0,0 +1,311 @@
+# Surrogate emulator for the Blue and Arnett kilonova models: each band's
+# light curve is reduced with PCA and the PCA coefficients are interpolated
+# over the ejecta parameters with a Gaussian process
+
+import os
+import numpy as np
+import scipy.linalg
+import scipy.optimize
+
+from gwemlightcurves import lightcurve_grid
+
+# ejecta parameters of each model and the default training range. Parameters
+# flagged "log" are sampled and emulated in log10. The ranges cover the
+# bright, physically motivated part of the sampler priors; outside them the
+# light curves are mostly below the clipping limits and emulate poorly.
+EMULATOR_MODELS = {
+    "Blue": [("mej","log",1e-3,0.1),("vej","lin",0.05,0.3),
+             ("beta","lin",1.0,5.0),("kappa_r","log",0.1,30.0)],
+    "Arnett": [("mej","log",1e-3,0.1),("vej","lin",0.05,0.3),
+               ("slope_r","lin",-2.0,0.0),("kappa_r","log",0.1,30.0)],
+}
+
+# magnitudes fainter than MAGMAX (absolute) and luminosities below LBOLMIN
+# (erg/s), including the NaN and infinite ones, are clipped before training;
+# they are far below any detection limit and otherwise dominate the PCA
+MAGMAX = 0.0
+LBOLMIN = 1e30
+
+_emulators = {}
+
+def calc_kernel(x1,x2,lengths):
+    """
+    Squared-exponential correlation between the rows of x1 and x2.
+    """
+
+    dist = (x1[:,np.newaxis,:]-x2[np.newaxis,:,:])/lengths
+    return np.exp(-0.5*np.sum(dist**2,axis=-1))
+
+def gp_loglike(theta,x,z):
+    """
+    Log marginal likelihood of the columns of z under a zero-mean Gaussian
+    process with length scales exp(theta[:-1]) and relative nugget
+    exp(theta[-1]), with the amplitude profiled out.
+    """
+
+    lengths, nugget = np.exp(theta[:-1]), np.exp(theta[-1])
+    K = calc_kernel(x,x,lengths) + nugget*np.eye(len(x))
+    try:
+        L = scipy.linalg.cholesky(K,lower=True)
+    except np.linalg.LinAlgError:
+        return -np.inf
+    alpha = scipy.linalg.cho_solve((L,True),z)
+    N, M = z.shape
+    s2 = np.sum(z*alpha)/(N*M)
+
+    return -0.5*N*M*np.log(s2) - M*np.sum(np.log(np.diag(L)))
+
+def calc_training_set(model,nsamples,ranges=None,tini=lightcurve_grid.TINI,tmax=lightcurve_grid.TMAX,dt=lightcurve_grid.DT,nprocs=1,seed=None):
+    """
+    Evaluate model at nsamples points drawn uniformly in the unit cube of
+    ranges, a list of (min, max) per parameter defaulting to the
+    EMULATOR_MODELS ranges (log10 for log parameters).
+
+    Returns the unit-cube coordinates, the times and the clipped outputs,
+    an (nsamples, 10, n_times) array holding the u, g, r, i, z, y, J, H, K
+    magnitudes and log10 of the bolometric luminosity.
+    """
+
+    if not model in EMULATOR_MODELS:
+        raise ValueError("Unknown emulator model %s, available: %s"%(model,", ".join(sorted(EMULATOR_MODELS.keys()))))
+    if ranges is None:
+        ranges = [param[2:] for param in EMULATOR_MODELS[model]]
+    scales = [param[1] for param in EMULATOR_MODELS[model]]
+
+    x = np.random.RandomState(seed).uniform(size=(nsamples,len(scales)))
+    params = unit_to_params(x,scales,ranges)
+    t, lbol, mag = lightcurve_grid.calc_models(model,params,tini=tini,tmax=tmax,dt=dt,nprocs=nprocs)
+
+    mag[~np.isfinite(mag) | (mag > MAGMAX)] = MAGMAX
+    lbol[~np.isfinite(lbol) | (lbol < LBOLMIN)] = LBOLMIN
+    y = np.concatenate((mag,np.log10(lbol)[:,np.newaxis,:]),axis=1)
+
+    return x, t, y
+
+def unit_to_params(x,scales,ranges):
+    """
+    Map unit-cube coordinates x (N, n_params) to parameters with the given
+    scales ("lin" or "log") and (min, max) ranges.
+    """
+
+    params = np.zeros(x.shape)
+    for ii, (scale, (pmin, pmax)) in enumerate(zip(scales,ranges)):
+        if scale == "log":
+            params[:,ii] = 10**(np.log10(pmin) + x[:,ii]*(np.log10(pmax)-np.log10(pmin)))
+        else:
+            params[:,ii] = pmin + x[:,ii]*(pmax-pmin)
+    return params
+
+def params_to_unit(params,scales,ranges):
+    """
+    Inverse of unit_to_params, NaN for non-positive values of log
+    parameters.
+    """
+
+    params = np.atleast_2d(np.asarray(params,dtype=float))
+    x = np.zeros(params.shape)
+    for ii, (scale, (pmin, pmax)) in enumerate(zip(scales,ranges)):
+        if scale == "log":
+            with np.errstate(divide='ignore',invalid='ignore'):
+                x[:,ii] = (np.log10(params[:,ii])-np.log10(pmin))/(np.log10(pmax)-np.log10(pmin))
+        else:
+            x[:,ii] = (params[:,ii]-pmin)/(pmax-pmin)
+    return x
+
+def train_emulator(model,ntrain=500,ntest=200,ncomponents=10,ranges=None,tini=lightcurve_grid.TINI,tmax=lightcurve_grid.TMAX,dt=lightcurve_grid.DT,nprocs=1,seed=None):
+    """
+    Train an emulator of model on ntrain random evaluations within ranges
+    (see calc_training_set), keeping ncomponents principal components per
+    band, and validate it on ntest further evaluations.
+
+    Returns an emulator dict; its "rms" entry holds the validation RMS
+    error of each band (mag, where the band is brighter than MAGMAX) and of
+    log10 lbol (dex). With the default ranges, 500 training light curves
+    and 0.1 < t < 10 days the median error is 0.05 (Blue) to 0.09 (Arnett)
+    mag and the RMS 0.1-0.5 mag, largest in the blue bands.
+    """
+
+    if model in EMULATOR_MODELS and ranges is None:
+        ranges = [param[2:] for param in EMULATOR_MODELS[model]]
+    x, t, y = calc_training_set(model,ntrain+ntest,ranges=ranges,tini=tini,tmax=tmax,dt=dt,nprocs=nprocs,seed=seed)
+    xtrain, ytrain = x[:ntrain], y[:ntrain]
+    nblocks = y.shape[1]
+    ncomponents = min(ncomponents,ntrain,len(t))
+
+    # PCA of each band
+    mean = np.mean(ytrain,axis=0)
+    basis = np.zeros((nblocks,ncomponents,len(t)))
+    resid = np.zeros((nblocks,len(t)))
+    coeffs = np.zeros((ntrain,nblocks,ncomponents))
+    for ii in xrange(nblocks):
+        u, s, vt = np.linalg.svd(ytrain[:,ii,:]-mean[ii],full_matrices=False)
+        basis[ii] = vt[:ncomponents]
+        coeffs[:,ii,:] = np.dot(ytrain[:,ii,:]-mean[ii],basis[ii].T)
+        resid[ii] = np.var(ytrain[:,ii,:]-mean[ii]-np.dot(coeffs[:,ii,:],basis[ii]),axis=0)
+
+    # the coefficients of a band share one scale, so that the leading
+    # components dominate the choice of the kernel length scales
+    coeff_std = np.repeat(np.sqrt(np.sum(np.var(coeffs,axis=0),axis=1)),ncomponents)
+    coeff_std[coeff_std == 0] = 1.0
+    coeffs = coeffs.reshape((ntrain,-1))
+    coeff_mean = np.mean(coeffs,axis=0)
+    z = (coeffs-coeff_mean)/coeff_std
+
+    # one Gaussian process for all coefficients, so that a prediction is a
+    # single kernel row times a weight matrix
+    ndim = x.shape[1]
+    theta0 = np.append(np.log(0.3*np.ones(ndim)),np.log(1e-4))
+    bounds = [(np.log(0.01),np.log(10.0))]*ndim + [(np.log(1e-8),np.log(1.0))]
+    res = scipy.optimize.minimize(lambda theta: -gp_loglike(theta,xtrain,z),theta0,method='L-BFGS-B',bounds=bounds)
+    lengths, nugget = np.exp(res.x[:-1]), np.exp(res.x[-1])
+
+    K = calc_kernel(xtrain,xtrain,lengths) + nugget*np.eye(ntrain)
+    L = scipy.linalg.cholesky(K,lower=True)
+    alpha = scipy.linalg.cho_solve((L,True),z)
+
+    emulator = {}
+    emulator["model"] = model
+    emulator["parameters"] = [param[0] for param in EMULATOR_MODELS[model]]
+    emulator["scales"] = [param[1] for param in EMULATOR_MODELS[model]]
+    emulator["ranges"] = np.array(ranges,dtype=float)
+    emulator["t"] = t
+    emulator["x"] = xtrain
+    emulator["lengths"] = lengths
+    emulator["amplitude"] = np.sum(z*alpha)/z.size
+    emulator["chol"] = L
+    emulator["alpha"] = alpha
+    emulator["coeff_mean"] = coeff_mean
+    emulator["coeff_std"] = coeff_std
+    emulator["mean"] = mean
+    emulator["basis"] = basis
+    emulator["resid"] = resid
+
+    if ntest > 0:
+        ypred = np.array([predict(emulator,xx)[0] for xx in x[ntrain:]])
+        err2 = (ypred-y[ntrain:])**2
+        bright = np.ones(err2.shape,dtype=bool)
+        bright[:,:9,:] = y[ntrain:,:9,:] < MAGMAX
+        emulator["rms"] = np.sqrt(np.sum(err2*bright,axis=(0,2))/np.maximum(np.sum(bright,axis=(0,2)),1))
+    else:
+        emulator["rms"] = np.nan*np.ones((nblocks,))
+
+    return emulator
+
+def predict(emulator,x,return_sigma=False):
+    """
+    Emulated (10, n_times) outputs at the unit-cube coordinates x, and
+    optionally their 1-sigma uncertainty from the Gaussian process and the
+    PCA truncation.
+    """
+
+    r = calc_kernel(x[np.newaxis,:],emulator["x"],emulator["lengths"])[0]
+    coeffs = np.dot(r,emulator["alpha"])*emulator["coeff_std"] + emulator["coeff_mean"]
+    basis = emulator["basis"]
+    nblocks, ncomponents = basis.shape[:2]
+    coeffs = coeffs.reshape((nblocks,ncomponents))
+    y = emulator["mean"] + np.einsum('ij,ijk->ik',coeffs,basis)
+
+    if not return_sigma:
+        return y, None
+
+    v = scipy.linalg.solve_triangular(emulator["chol"],r,lower=True)
+    var = max(emulator["amplitude"]*(1.0-np.dot(v,v)),0.0)
+    coeff_var = (var*emulator["coeff_std"]**2).reshape((nblocks,ncomponents))
+    sigma = np.sqrt(np.einsum('ij,ijk->ik',coeff_var,basis**2) + emulator["resid"])
+
+    return y, sigma
+
+def save_emulator(filename,emulator):
+    """
+    Write an emulator dict from train_emulator to the .npz file filename.
+    """
+
+    arrays = dict(emulator)
+    arrays["model"] = np.array(emulator["model"])
+    arrays["parameters"] = np.array(emulator["parameters"])
+    arrays["scales"] = np.array(emulator["scales"])
+
+    np.savez(filename,**arrays)
+
+def load_emulator(filename):
+    """
+    Emulator dict stored in the .npz file filename by save_emulator, cached
+    for the lifetime of the process.
+    """
+
+    filename = os.path.abspath(filename)
+    if not filename in _emulators:
+        if not os.path.isfile(filename):
+            raise IOError("Emulator %s does not exist"%filename)
+
+        data = np.load(filename)
+        emulator = {}
+        for key in data.files:
+            emulator[key] = data[key]
+        data.close()
+        emulator["model"] = str(emulator["model"])
+        emulator["parameters"] = [str(param) for param in emulator["parameters"]]
+        emulator["scales"] = [str(scale) for scale in emulator["scales"]]
+        emulator["amplitude"] = float(emulator["amplitude"])
+        _emulators[filename] = emulator
+
+    return _emulators[filename]
+
+def param_range(emulator,name):
+    """
+    Training range [min, max] of parameter name of emulator.
+    """
+
+    pmin, pmax = emulator["ranges"][emulator["parameters"].index(name)]
+    return [float(pmin),float(pmax)]
+
+def lightcurve(emulator,*params):
+    """
+    Emulated t, lbol, mag at the parameters params (physical units,
+    EMULATOR_MODELS order), like the *_model_ejecta wrappers. Outside the
+    training ranges lbol is zero and the magnitudes are NaN.
+    """
+
+    t, y = _evaluate(emulator,params,False)[:2]
+    if y is None:
+        return t, np.zeros(t.shape), np.nan*np.ones((9,len(t)))
+
+    return t, 10**y[9], y[:9]
+
+def lightcurve_sigma(emulator,*params):
+    """
+    Emulator 1-sigma uncertainty at params: the (9, n_times) magnitude
+    uncertainty and the (n_times,) uncertainty of log10 lbol.
+    """
+
+    t, y, sigma = _evaluate(emulator,params,True)
+    if y is None:
+        return np.nan*np.ones((9,len(t))), np.nan*np.ones(t.shape)
+
+    return sigma[:9], sigma[9]
+
+def _evaluate(emulator,params,return_sigma):
+
+    t = emulator["t"]
+    if len(params) != emulator["x"].shape[1]:
+        raise ValueError("%s emulators take %d parameters"%(emulator["model"],emulator["x"].shape[1]))
+    x = params_to_unit([params],emulator["scales"],emulator["ranges"])[0]
+    if not np.all((x >= 0) & (x <= 1)):
+        return t, None, None
+
+    y, sigma = predict(emulator,x,return_sigma=return_sigma)
+    return t, y, sigma
+
+def errorbudget(emulator,filters):
+    """
+    Emulator validation RMS (mag) over the bands in filters, to be added in
+    quadrature to the photometric error budget.
+    """
+
+    keyslist = ["u","g","r","i","z","y","J","H","K"]
+    idx = [keyslist.index(key) for key in filters if key in keyslist]
+    if "w" in filters:
+        idx = idx + [1,2,3]
+    if len(idx) == 0:
+        return 0.0
+    return float(np.max(emulator["rms"][idx]))
@@ -0,0 +1,306 @@
+# Precomputed light-curve grids for the BNS, BHNS, Blue and Arnett models
+# in their ejecta parameterizations, with multilinear interpolation so that
+# samplers can replace full physics evaluations by grid lookups
+
+import os
+import multiprocessing
+import numpy as np
+
+from gwemlightcurves import BNSKilonovaLightcurve, BHNSKilonovaLightcurve, BlueKilonovaLightcurve, ArnettKilonovaLightcurve
+
+# ejecta parameters of each model, with the parameter range and the number
+# of grid points of the default grid. Parameters flagged "log" are gridded
+# and interpolated in log10, as they are sampled. The models are singular
+# at vej = 0 and beta = 0, and the BNS and BHNS luminosities vanish at
+# ph = 0 (rising as ph**0.5 before the photosphere recedes, hence the log
+# ph axes), so those axes start above zero and fits with a grid restrict
+# their priors to the axes (param_range).
+GRID_MODELS = {
+    "BNS": [("mej","log",1e-5,1.0,11),("vej","lin",0.02,1.0,11),
+            ("th","lin",0.0,np.pi/2,6),("ph","log",0.01,2*np.pi,8)],
+    "BHNS": [("mej","log",1e-5,1.0,11),("vej","lin",0.02,1.0,11),
+             ("th","lin",0.0,np.pi/2,6),("ph","log",0.01,2*np.pi,8)],
+    "Blue": [("mej","log",1e-5,1.0,11),("vej","lin",0.02,1.0,11),
+             ("beta","lin",0.5,10.0,6),("kappa_r","log",1e-2,1e2,6)],
+    "Arnett": [("mej","log",1e-5,1.0,11),("vej","lin",0.02,1.0,11),
+               ("slope_r","lin",-5.0,5.0,6),("kappa_r","log",1e-2,1e2,6)],
+}
+
+# fixed physics of the ejecta models, as in bin/run_lightcurves_models.py
+TINI = 0.1
+TMAX = 50.0
+DT = 0.1
+VMIN = 0.00
+KAPPA = 10.0
+EPS = 1.58*(10**10)
+ALP = 1.2
+ETH = 0.5
+FLGBCT = 1
+
+_grids = {}
+
+def default_axes(model):
+    """
+    Default grid axes of model, one array per parameter in GRID_MODELS
+    order, in physical units.
+    """
+
+    if not model in GRID_MODELS:
+        raise ValueError("Unknown grid model %s, available: %s"%(model,", ".join(sorted(GRID_MODELS.keys()))))
+
+    axes = []
+    for name, scale, pmin, pmax, npoints in GRID_MODELS[model]:
+        if scale == "log":
+            axes.append(np.logspace(np.log10(pmin),np.log10(pmax),npoints))
+        else:
+            axes.append(np.linspace(pmin,pmax,npoints))
+    return axes
+
+def calc_model(model,params,tini=TINI,tmax=TMAX,dt=DT):
+    """
+    Evaluate model at each row of params, an (N, n_params) array in
+    GRID_MODELS order. Returns the times, the (N, n_times) bolometric
+    luminosities and the (N, 9, n_times) magnitudes.
+    """
+
+    params = np.atleast_2d(params)
+    if model == "BNS":
+        return BNSKilonovaLightcurve.calc_lc_batch(tini,tmax,dt,params[:,0],params[:,1],VMIN,params[:,2],params[:,3],KAPPA,EPS,ALP,ETH,FLGBCT)
+    elif model == "BHNS":
+        return BHNSKilonovaLightcurve.calc_lc_batch(tini,tmax,dt,params[:,0],params[:,1],VMIN,params[:,2],params[:,3],KAPPA,EPS,ALP,ETH)
+
+    if model == "Blue":
+        calc_lc = BlueKilonovaLightcurve.calc_lc
+    elif model == "Arnett":
+        calc_lc = ArnettKilonovaLightcurve.calc_lc
+    else:
+        raise ValueError("Unknown grid model %s, available: %s"%(model,", ".join(sorted(GRID_MODELS.keys()))))
+
+    lbols, mags = [], []
+    for param in params:
+        t, lbol, mag, Tobs = calc_lc(tini,tmax,dt,*param)
+        lbols.append(lbol)
+        mags.append(mag)
+    return t, np.array(lbols), np.array(mags)
+
+def _calc_model_chunk(args):
+    return calc_model(*args)
+
+def calc_models(model,params,tini=TINI,tmax=TMAX,dt=DT,nprocs=1,chunksize=64):
+    """
+    calc_model over the rows of params, split in chunks of chunksize rows
+    evaluated by nprocs worker processes.
+    """
+
+    chunks = [(model,params[ii:ii+chunksize],tini,tmax,dt) for ii in xrange(0,len(params),chunksize)]
+    if nprocs > 1:
+        pool = multiprocessing.Pool(nprocs)
+        results = pool.map(_calc_model_chunk,chunks)
+        pool.close()
+        pool.join()
+    else:
+        results = [_calc_model_chunk(chunk) for chunk in chunks]
+
+    t = results[0][0]
+    lbol = np.concatenate([result[1] for result in results])
+    mag = np.concatenate([result[2] for result in results])
+
+    return t, lbol, mag
+
+def calc_grid(model,axes=None,tini=TINI,tmax=TMAX,dt=DT,nprocs=1,chunksize=64,nvalidate=200,seed=None):
+    """
+    Evaluate model on the outer product of axes (default_axes by default),
+    using nprocs worker processes.
+
+    Returns a grid dict with the model name, the parameter names and
+    scales, the axes, the times t, log10 of the bolometric luminosity
+    (loglbol, shape axes + (n_times,)) and the magnitudes (mag, shape
+    axes + (9, n_times)), stored in single precision. Its "rms" entry holds
+    the interpolation RMS of validate_grid at nvalidate random points.
+    """
+
+    if axes is None:
+        axes = default_axes(model)
+    axes = [np.asarray(axis,dtype=float) for axis in axes]
+    if not model in GRID_MODELS or len(axes) != len(GRID_MODELS[model]):
+        raise ValueError("%s grids need %d axes"%(model,len(GRID_MODELS.get(model,[]))))
+
+    shape = tuple([len(axis) for axis in axes])
+    params = np.array([mesh.ravel() for mesh in np.meshgrid(*axes,indexing='ij')]).T
+    t, lbol, mag = calc_models(model,params,tini=tini,tmax=tmax,dt=dt,nprocs=nprocs,chunksize=chunksize)
+
+    with np.errstate(divide='ignore',invalid='ignore'):
+        loglbol = np.log10(lbol)
+    loglbol[~np.isfinite(loglbol)] = np.nan
+
+    grid = {}
+    grid["model"] = model
+    grid["parameters"] = [param[0] for param in GRID_MODELS[model]]
+    grid["scales"] = [param[1] for param in GRID_MODELS[model]]
+    grid["axes"] = axes
+    grid["t"] = t
+    grid["loglbol"] = loglbol.reshape(shape+(len(t),)).astype(np.float32)
+    grid["mag"] = mag.reshape(shape+mag.shape[1:]).astype(np.float32)
+    set_coords(grid)
+
+    if nvalidate > 0:
+        grid["rms"] = validate_grid(grid,nvalidate,tini=tini,tmax=tmax,dt=dt,nprocs=nprocs,chunksize=chunksize,seed=seed)
+    else:
+        grid["rms"] = np.nan*np.ones((10,))
+
+    return grid
+
+def validate_grid(grid,nsamples,tini=TINI,tmax=TMAX,dt=DT,nprocs=1,chunksize=64,seed=None):
+    """
+    Interpolation error of grid at nsamples points drawn uniformly (in the
+    gridded coordinates) within its axes, against the model itself.
+
+    Returns the RMS over the points and times of the u, g, r, i, z, y, J, H
+    and K magnitudes (mag) and of log10 lbol (dex), where both the model
+    and the interpolation are finite.
+    """
+
+    state = np.random.RandomState(seed)
+    coords = np.array([state.uniform(coord[0],coord[-1],nsamples) for coord in grid["coords"]]).T
+    params = np.array([10**coords[:,ii] if scale == "log" else coords[:,ii] for ii, scale in enumerate(grid["scales"])]).T
+
+    t, lbol, mag = calc_models(grid["model"],params,tini=tini,tmax=tmax,dt=dt,nprocs=nprocs,chunksize=chunksize)
+    if not len(t) == len(grid["t"]):
+        raise ValueError("Validation times do not match the grid times")
+
+    err2 = np.zeros((10,))
+    counts = np.zeros((10,))
+    with np.errstate(divide='ignore',invalid='ignore'):
+        for param, lbol_model, mag_model in zip(params,lbol,mag):
+            t, lbol_grid, mag_grid = lightcurve(grid,*param)
+            diff = np.vstack((mag_grid-mag_model,np.log10(lbol_grid)-np.log10(lbol_model)))
+            finite = np.isfinite(diff)
+            err2 = err2 + np.sum(np.where(finite,diff,0.0)**2,axis=1)
+            counts = counts + np.sum(finite,axis=1)
+
+    return np.sqrt(err2/np.maximum(counts,1))
+
+def errorbudget(grid,filters):
+    """
+    Grid interpolation RMS (mag) over the bands in filters, to be added in
+    quadrature to the photometric error budget; zero for grids saved
+    without a validation.
+    """
+
+    keyslist = ["u","g","r","i","z","y","J","H","K"]
+    idx = [keyslist.index(key) for key in filters if key in keyslist]
+    if "w" in filters:
+        idx = idx + [1,2,3]
+    if len(idx) == 0 or not np.all(np.isfinite(grid["rms"][idx])):
+        return 0.0
+    return float(np.max(grid["rms"][idx]))
+
+def save_grid(filename,grid):
+    """
+    Write a grid dict from calc_grid to the .npz file filename.
+    """
+
+    arrays = {}
+    arrays["model"] = np.array(grid["model"])
+    arrays["parameters"] = np.array(grid["parameters"])
+    arrays["scales"] = np.array(grid["scales"])
+    for ii, axis in enumerate(grid["axes"]):
+        arrays["axis_%d"%ii] = axis
+    arrays["t"] = grid["t"]
+    arrays["loglbol"] = grid["loglbol"]
+    arrays["mag"] = grid["mag"]
+    arrays["rms"] = grid["rms"]
+
+    np.savez(filename,**arrays)
+
+def load_grid(filename):
+    """
+    Grid dict stored in the .npz file filename by save_grid, cached for the
+    lifetime of the process.
+    """
+
+    filename = os.path.abspath(filename)
+    if not filename in _grids:
+        if not os.path.isfile(filename):
+            raise IOError("Light-curve grid %s does not exist"%filename)
+
+        data = np.load(filename)
+        grid = {}
+        grid["model"] = str(data["model"])
+        grid["parameters"] = [str(param) for param in data["parameters"]]
+        grid["scales"] = [str(scale) for scale in data["scales"]]
+        grid["axes"] = [data["axis_%d"%ii] for ii in xrange(len(grid["parameters"]))]
+        grid["t"] = data["t"]
+        grid["loglbol"] = data["loglbol"]
+        grid["mag"] = data["mag"]
+        if "rms" in data.files:
+            grid["rms"] = data["rms"]
+        else:
+            grid["rms"] = np.nan*np.ones((10,))
+        data.close()
+
+        set_coords(grid)
+        _grids[filename] = grid
+
+    return _grids[filename]
+
+def set_coords(grid):
+    """
+    Add the interpolation coordinates (log10 for log axes) and the corner
+    offsets of a grid cell to grid.
+    """
+
+    grid["coords"] = [np.log10(axis) if scale == "log" else axis for axis, scale in zip(grid["axes"],grid["scales"])]
+    grid["offsets"] = np.array([[(corner >> jj) & 1 for jj in xrange(len(grid["axes"]))] for corner in xrange(2**len(grid["axes"]))])
+
+def param_range(grid,name):
+    """
+    Range [min, max] covered by the axis of parameter name of grid.
+    """
+
+    axis = grid["axes"][grid["parameters"].index(name)]
+    return [float(np.min(axis)),float(np.max(axis))]
+
+def lightcurve(grid,*params):
+    """
+    Multilinear interpolation of a grid dict at the parameters params
+    (physical units, GRID_MODELS order).
+
+    Returns t, lbol, mag like the *_model_ejecta wrappers. Outside the grid
+    lbol is zero and the magnitudes are NaN, which the likelihoods treat as
+    an excluded point. The interpolation error falls quadratically with the
+    grid spacing, except across the discontinuities of the models (e.g. the
+    end of the Arnett diffusion phase); grid["rms"] holds its validation RMS.
+    """
+
+    t = grid["t"]
+    nt = len(t)
+    if len(params) != len(grid["coords"]):
+        raise ValueError("%s grids take %d parameters"%(grid["model"],len(grid["coords"])))
+
+    idxs, fracs = [], []
+    for param, scale, coord in zip(params,grid["scales"],grid["coords"]):
+        if scale == "log":
+            if not param > 0:
+                return t, np.zeros((nt,)), np.nan*np.ones((9,nt))
+            param = np.log10(param)
+        if (param < coord[0]) or (param > coord[-1]):
+            return t, np.zeros((nt,)), np.nan*np.ones((9,nt))
+        ii = min(max(np.searchsorted(coord,param)-1,0),len(coord)-2)
+        idxs.append(ii)
+        fracs.append((param-coord[ii])/(coord[ii+1]-coord[ii]))
+
+    # weighted sum over the 2^n corners of the enclosing cell; corners with
+    # zero weight are dropped so that NaN neighbours do not leak into
+    # queries on a cell face
+    offsets = grid["offsets"]
+    weights = np.prod(np.where(offsets,fracs,1.0-np.array(fracs)),axis=1)
+    keep = weights > 0
+    corners = tuple((np.array(idxs)+offsets[keep]).T)
+    loglbol = np.dot(weights[keep],grid["loglbol"][corners])
+    mag = np.tensordot(weights[keep],grid["mag"][corners],axes=1)
+
+    lbol = 10**loglbol
+    lbol[~np.isfinite(lbol)] = 0.0
+
+    return t, lbol, mag
@@ -0,0 +1,243 @@
+# Light-curve likelihoods of bin/run_lightcurves_models.py and
+# bin/run_luminosity_models.py, with everything that does not depend on the
+# model (data selection, band mapping, upper limits, uncertainties and
+# weights) computed once, so that a likelihood call only interpolates the
+# model onto the observations
+
+import numpy as np
+import scipy.special
+
+from gwemlightcurves import lightcurve_utils
+
+# model magnitude rows of each band; "w" is the average of g, r and i
+BANDS = {"u": [0], "g": [1], "r": [2], "i": [3], "z": [4], "y": [5],
+         "J": [6], "H": [7], "K": [8], "w": [1,2,3]}
+
+def chi2_logpdf(chisquare):
+    """
+    scipy.stats.chi2.logpdf(chisquare, 1) without the scipy overhead.
+    """
+
+    with np.errstate(divide='ignore'):
+        return -0.5*chisquare - 0.5*np.log(chisquare) - 0.5*np.log(2*np.pi)
+
+def interp_extrap(t,tmodel,model):
+    """
+    Linear interpolation of model (at the increasing times tmodel) at t,
+    extrapolated linearly beyond the ends like
+    interp1d(..., fill_value='extrapolate').
+    """
+
+    if len(tmodel) == 1:
+        return model[0]*np.ones(t.shape)
+
+    values = np.interp(t,tmodel,model)
+    idx = t < tmodel[0]
+    if np.any(idx):
+        values[idx] = model[0] + (t[idx]-tmodel[0])*(model[1]-model[0])/(tmodel[1]-tmodel[0])
+    idx = t > tmodel[-1]
+    if np.any(idx):
+        values[idx] = model[-1] + (t[idx]-tmodel[-1])*(model[-1]-model[-2])/(tmodel[-1]-tmodel[-2])
+    return values
+
+def setup(data_out,filters,errorbudget,zprange=50.0,marginalize=False):
+    """
+    Magnitude likelihood for the photometry in data_out ({filter: (N,3)
+    array of time, mag, error}), restricted to filters. Points with an
+    infinite error are upper limits. errorbudget is the model uncertainty
+    (mag) added in quadrature; with marginalize, the zero point is
+    integrated out over a uniform prior on [-zprange, zprange].
+    """
+
+    bands = []
+    for key in data_out:
+        if not key in filters or not key in BANDS:
+            continue
+
+        samples = np.asarray(data_out[key])
+        idx = np.where(~np.isnan(samples[:,1]))[0]
+        t = samples[idx,0]
+        y = samples[idx,1]
+        sigma = np.sqrt(errorbudget**2 + samples[idx,2]**2)
+
+        weight = 1.0
+        if not float(len(y)-1) == 0:
+            weight = 1/float(len(y)-1)
+
+        band = {}
+        band["name"] = key
+        band["rows"] = BANDS[key]
+        band["t"] = t
+        band["y"] = y
+        band["detections"] = np.where(~np.isinf(sigma))[0]
+        band["limits"] = np.where(np.isinf(sigma))[0]
+        band["ivar"] = weight/sigma[band["detections"]]**2
+        bands.append(band)
+
+    likelihood = {}
+    likelihood["bands"] = bands
+    likelihood["errorbudget"] = errorbudget
+    likelihood["zprange"] = zprange
+    likelihood["marginalize"] = marginalize
+    likelihood["ivar"] = np.concatenate([band["ivar"] for band in bands]) if len(bands) > 0 else np.array([])
+
+    return likelihood
+
+def calc_residuals(likelihood,tmag,lbol,mag,t0):
+    """
+    Residuals of the data of likelihood with respect to the model light
+    curve (tmag, lbol, mag) shifted by t0, as the concatenated detections
+    and a list of the upper limit residuals of each band, or None if the
+    model cannot be compared with the data.
+    """
+
+    if np.sum(lbol) == 0.0:
+        return None
+    if len(likelihood["bands"]) == 0:
+        return None
+    tmag = tmag + t0
+
+    residuals, limits = [], []
+    for band in likelihood["bands"]:
+        rows = band["rows"]
+        if len(rows) == 1:
+            model = mag[rows[0]]
+        else:
+            model = (mag[rows[0]]+mag[rows[1]]+mag[rows[2]])/3.0
+
+        ii = np.where(~np.isnan(model))[0]
+        if len(ii) == 0:
+            return None
+        maginterp = interp_extrap(band["t"],tmag[ii],model[ii])
+
+        residual = band["y"] - maginterp
+        if np.any(np.isnan(residual)):
+            return None
+        residuals.append(residual[band["detections"]])
+        if len(band["limits"]) > 0:
+            limits.append(residual[band["limits"]])
+
+    return np.concatenate(residuals), limits
+
+def calc_zpbest(likelihood,tmag,lbol,mag,t0):
+    """
+    Maximum likelihood zero point of the model light curve (tmag, lbol, mag)
+    shifted by t0, or nan if the model cannot be compared with the data.
+    """
+
+    out = calc_residuals(likelihood,tmag,lbol,mag,t0)
+    if out is None:
+        return np.nan
+    return lightcurve_utils.best_zp(out[0],likelihood["ivar"])
+
+def calc_prob(likelihood,tmag,lbol,mag,t0,zp):
+    """
+    Log likelihood of the model light curve (tmag, lbol, mag) shifted by t0
+    and zp, identical to the chi2 scoring of run_lightcurves_models.py.
+
+    Returns the log likelihood and the zero point, which with marginalize
+    is a draw from its conditional posterior.
+    """
+
+    out = calc_residuals(likelihood,tmag,lbol,mag,t0)
+    if out is None:
+        return -np.inf, zp
+    residuals, limits = out
+    errorbudget = likelihood["errorbudget"]
+
+    if likelihood["marginalize"]:
+        prob, zpbest, zp = lightcurve_utils.marginalize_zp(residuals,likelihood["ivar"],likelihood["zprange"])
+        # upper limits enter at the best fit zero point
+        zplimit = zpbest
+    else:
+        prob = chi2_logpdf(np.sum(likelihood["ivar"]*(residuals-zp)**2))
+        zplimit = zp
+
+    for residual in limits:
+        with np.errstate(divide='ignore'):
+            prob = prob + np.sum(np.log(scipy.special.ndtr((residual-zplimit)/errorbudget)))
+
+    if np.isnan(prob):
+        prob = -np.inf
+
+    return prob, zp
+
+def setup_lbol(data_out,errorbudget,zprange=50.0,marginalize=False):
+    """
+    Bolometric luminosity likelihood for data_out with the times tt,
+    luminosities Lbol and errors Lbol_err (erg/s). errorbudget is the
+    fractional model uncertainty; the comparison is made in log10.
+    """
+
+    y = np.asarray(data_out["Lbol"])
+    idx = np.where(~np.isnan(y))[0]
+    t = np.asarray(data_out["tt"])[idx]
+    y = y[idx]
+    sigma_y = np.abs(np.asarray(data_out["Lbol_err"])[idx]/(y*np.log(10)))
+    sigma = np.sqrt((np.log10(1+errorbudget))**2 + sigma_y**2)
+
+    weight = 1.0
+    if not float(len(y)-1) == 0:
+        weight = 1/float(len(y)-1)
+
+    likelihood = {}
+    likelihood["t"] = t
+    likelihood["logy"] = np.log10(y)
+    likelihood["ivar"] = weight/sigma**2
+    likelihood["zprange"] = zprange
+    likelihood["marginalize"] = marginalize
+
+    return likelihood
+
+def calc_residuals_lbol(likelihood,tmag,lbol,t0):
+    """
+    log10 luminosity residuals of the data of likelihood with respect to the
+    model (tmag, lbol) shifted by t0, or None if they cannot be computed.
+    """
+
+    if np.sum(lbol) == 0.0:
+        return None
+    tmag = tmag + t0
+
+    ii = np.where(~np.isnan(lbol))[0]
+    if len(ii) == 0:
+        return None
+    with np.errstate(divide='ignore',invalid='ignore'):
+        residuals = likelihood["logy"] - interp_extrap(likelihood["t"],tmag[ii],np.log10(lbol[ii]))
+    if np.any(np.isnan(residuals)):
+        return None
+
+    return residuals
+
+def calc_zpbest_lbol(likelihood,tmag,lbol,t0):
+    """
+    Maximum likelihood zero point of the model bolometric light curve
+    (tmag, lbol) shifted by t0, or nan if it cannot be computed.
+    """
+
+    residuals = calc_residuals_lbol(likelihood,tmag,lbol,t0)
+    if residuals is None:
+        return np.nan
+    return lightcurve_utils.best_zp(residuals,likelihood["ivar"],scale=-1/2.5)
+
+def calc_prob_lbol(likelihood,tmag,lbol,t0,zp):
+    """
+    Log likelihood of the model bolometric light curve (tmag, lbol) shifted
+    by t0 and scaled by 10**(-zp/2.5), identical to the chi2 scoring of
+    run_luminosity_models.py. Returns the log likelihood and the zero point.
+    """
+
+    residuals = calc_residuals_lbol(likelihood,tmag,lbol,t0)
+    if residuals is None:
+        return -np.inf, zp
+
+    # log10(lbol) shifts by -zp/2.5
+    if likelihood["marginalize"]:
+        prob, zpbest, zp = lightcurve_utils.marginalize_zp(residuals,likelihood["ivar"],likelihood["zprange"],scale=-1/2.5)
+    else:
+        prob = chi2_logpdf(np.sum(likelihood["ivar"]*(residuals+zp/2.5)**2))
+
+    if np.isnan(prob):
+        prob = -np.inf
+
+    return prob, zp
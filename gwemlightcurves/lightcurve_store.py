@@ -0,0 +1,188 @@
+# Indexed on-disk store of survey photometry (lightcurves.tmp files), built
+# once from the text file, so that a single object can be read without
+# parsing the whole catalogue and the catalogue can be iterated in chunks
+
+import os, shutil, tempfile
+import itertools
+import numpy as np
+
+STORE_FILES = ["ids","offsets","filters","values"]
+
+def store_dir(filename):
+    """
+    Default store directory of the photometry file filename.
+    """
+
+    return "%s.store"%filename
+
+def store_version(filename):
+    """
+    Name of the store version of the current filename, from its size and
+    modification time.
+    """
+
+    stat = os.stat(filename)
+    return "%d_%d"%(stat.st_size,int(round(stat.st_mtime*1e6)))
+
+def version_dir(filename,storeDir=None):
+    """
+    Directory of the store of the current filename within storeDir.
+    """
+
+    if storeDir is None:
+        storeDir = store_dir(filename)
+    return os.path.join(storeDir,store_version(filename))
+
+def build_store(filename,storeDir=None,chunksize=100000):
+    """
+    Parse filename (a header line, then rows of numid, psid, filter, mjd,
+    mag, dmag) in chunks of chunksize lines and write the store to a version
+    directory of storeDir: the rows sorted by psid (keeping the file order
+    within an object) as .npy arrays, with the sorted object ids and the row
+    offset of each object. Returns the version directory.
+    """
+
+    if storeDir is None:
+        storeDir = store_dir(filename)
+    versionDir = version_dir(filename,storeDir=storeDir)
+
+    psids, filters, values = [], [], []
+    with open(filename) as fid:
+        fid.readline()
+        while True:
+            lines = list(itertools.islice(fid,chunksize))
+            if len(lines) == 0:
+                break
+            rows = [line.split()[1:6] for line in lines if line.strip()]
+            if len(rows) == 0:
+                continue
+            table = np.array(rows)
+            psids.append(table[:,0])
+            filters.append(table[:,1])
+            values.append(table[:,2:5].astype(float))
+
+    if len(psids) > 0:
+        psids = np.concatenate(psids)
+        filters = np.concatenate(filters)
+        values = np.concatenate(values)
+    else:
+        psids, filters, values = np.array([],dtype=str), np.array([],dtype=str), np.empty((0,3))
+
+    order = np.argsort(psids,kind='mergesort')
+    psids, filters, values = psids[order], filters[order], values[order]
+    starts = np.where(np.concatenate(([True],psids[1:] != psids[:-1])))[0] if len(psids) > 0 else np.array([],dtype=int)
+
+    arrays = {}
+    arrays["ids"] = psids[starts]
+    arrays["offsets"] = np.append(starts,len(psids)).astype(np.int64)
+    arrays["filters"] = filters
+    arrays["values"] = values
+
+    # written next to the version directory and renamed, so that readers
+    # never see a partial store; stores of other versions are left in place
+    # until the new one exists, so that no reader finds storeDir missing
+    if not os.path.isdir(storeDir):
+        try:
+            os.makedirs(storeDir)
+        except OSError:
+            if not os.path.isdir(storeDir):
+                raise
+    tmpDir = tempfile.mkdtemp(dir=storeDir,prefix=".build_")
+    for key in STORE_FILES:
+        np.save(os.path.join(tmpDir,"%s.npy"%key),arrays[key])
+    try:
+        os.rename(tmpDir,versionDir)
+    except OSError:
+        # another process built this version first
+        shutil.rmtree(tmpDir,ignore_errors=True)
+
+    # remove stale versions, and the files of stores written before the
+    # stores were versioned; builds in progress start with a dot
+    for name in os.listdir(storeDir):
+        path = os.path.join(storeDir,name)
+        if name.startswith(".") or path == versionDir:
+            continue
+        if os.path.isdir(path):
+            shutil.rmtree(path,ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    return versionDir
+
+def is_current(filename,storeDir):
+    """
+    Whether storeDir holds a store built from the current filename.
+    """
+
+    versionDir = version_dir(filename,storeDir=storeDir)
+    for key in STORE_FILES:
+        if not os.path.isfile(os.path.join(versionDir,"%s.npy"%key)):
+            return False
+    return True
+
+def open_store(filename,storeDir=None):
+    """
+    Store of filename, built first if it is missing or older than filename.
+    The rows are memory-mapped, so only the objects read are loaded.
+    """
+
+    if storeDir is None:
+        storeDir = store_dir(filename)
+    for ii in xrange(10):
+        if is_current(filename,storeDir):
+            versionDir = version_dir(filename,storeDir=storeDir)
+        else:
+            versionDir = build_store(filename,storeDir=storeDir)
+
+        store = {}
+        try:
+            store["ids"] = np.load(os.path.join(versionDir,"ids.npy"))
+            store["offsets"] = np.load(os.path.join(versionDir,"offsets.npy"))
+            store["filters"] = np.load(os.path.join(versionDir,"filters.npy"),mmap_mode='r')
+            store["values"] = np.load(os.path.join(versionDir,"values.npy"),mmap_mode='r')
+        except (IOError,OSError):
+            # removed by the build of a newer filename
+            continue
+        return store
+
+    raise IOError("Could not open the store of %s"%filename)
+
+def object_rows(store,ii):
+    """
+    Photometry of the ii-th object of store, as {filter: (N,3) array of
+    mjd, mag, dmag} like lightcurve_utils.loadLightcurves.
+    """
+
+    start, end = store["offsets"][ii], store["offsets"][ii+1]
+    filters = np.array(store["filters"][start:end])
+    values = np.array(store["values"][start:end])
+
+    data = {}
+    for filt in np.unique(filters):
+        data[str(filt)] = values[filters == filt]
+    return data
+
+def load_object(store,name):
+    """
+    Photometry of the object name, or None if it is not in store.
+    """
+
+    ii = np.searchsorted(store["ids"],name)
+    if ii >= len(store["ids"]) or not store["ids"][ii] == name:
+        return None
+    return object_rows(store,ii)
+
+def iter_objects(store,chunksize=1000):
+    """
+    Iterate over the objects of store in chunks of chunksize, yielding
+    {psid: photometry} dicts.
+    """
+
+    for jj in xrange(0,len(store["ids"]),chunksize):
+        data = {}
+        for ii in xrange(jj,min(jj+chunksize,len(store["ids"]))):
+            data[str(store["ids"][ii])] = object_rows(store,ii)
+        yield data
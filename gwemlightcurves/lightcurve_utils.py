@@ -1,9 +1,10 @@
 
 import os, sys
+import hashlib, tempfile, json
 import optparse
 import numpy as np
 import glob
-import scipy.stats
+import scipy.stats, scipy.special
 
 import matplotlib
 #matplotlib.rc('text', usetex=True)
@@ -14,20 +15,175 @@ import matplotlib.pyplot as plt
 from astropy.time import Time
 from astropy.table import Table
 
+# model output products, by file name suffix
+CATALOG_PRODUCTS = [("Lbol","_Lbol.dat"),("spec","_spec.dat"),("mag",".dat")]
+CATALOG_SUFFIXES = dict(CATALOG_PRODUCTS)
+
+# catalogs of model output directories already read by this process
+_catalogs = {}
+
+def product_type(filename):
+    """
+    Product type ("mag", "Lbol" or "spec") and model name of a model output
+    file name, or (None, None) for other files.
+    """
+
+    for product, suffix in CATALOG_PRODUCTS:
+        if filename.endswith(suffix):
+            return product, filename[:-len(suffix)]
+    return None, None
+
+def end_lines(filename,nfirst=2):
+    """
+    The first nfirst and the last non-empty lines of filename, read without
+    going through the rest of the file.
+    """
+
+    with open(filename,'rb') as fid:
+        first = []
+        for line in fid:
+            if line.strip():
+                first.append(line.decode('utf-8'))
+            if len(first) == nfirst:
+                break
+
+        fid.seek(0,2)
+        size = fid.tell()
+        block = 4096
+        while True:
+            start = max(size-block,0)
+            fid.seek(start)
+            lines = [line for line in fid.read(size-start).splitlines() if line.strip()]
+            # the last line is complete once a line break precedes it
+            if start == 0 or len(lines) > 1:
+                break
+            block = 4*block
+
+    last = lines[-1].decode('utf-8') if len(lines) > 0 else ""
+    return first, last
+
+def catalog_metadata(filename,product):
+    """
+    Time range, and bands or wavelength range, of a model output file, from
+    its first and last lines.
+    """
+
+    try:
+        first, last = end_lines(filename)
+        meta = {}
+        if product == "spec":
+            lambdas = [float(x) for x in first[0].split()[1:]]
+            meta["lambdamin"], meta["lambdamax"] = min(lambdas), max(lambdas)
+            meta["tmin"], meta["tmax"] = float(first[1].split()[0]), float(last.split()[0])
+        else:
+            meta["tmin"], meta["tmax"] = float(first[0].split()[0]), float(last.split()[0])
+        if product == "mag":
+            meta["bands"] = ["u","g","r","i","z","y","J","H","K"][:len(first[0].split())-1]
+    except (IOError, ValueError, IndexError):
+        return {}
+
+    return meta
+
+def load_catalog(outputDir,catalogFile=None):
+    """
+    Manifest of the model products in outputDir: for each model directory
+    its modification time, and for each product file its name, product
+    type, modification time, size and catalog_metadata; no product is
+    parsed. The manifest is stored in catalogFile (by default in
+    ~/.cache/gwemlightcurves, keyed by the path of outputDir), and only
+    model directories changed since it was written are rescanned, reusing
+    the entries of unchanged files.
+    """
+
+    if catalogFile is None:
+        catalogFile = os.path.join(os.path.expanduser("~"),".cache","gwemlightcurves","catalog_%s.json"%cache_key(os.path.abspath(outputDir))[:16])
+
+    catalog = None
+    if os.path.isfile(catalogFile):
+        try:
+            catalog = json.load(open(catalogFile))
+        except ValueError:
+            catalog = None
+    if catalog is None:
+        catalog = {"dirs": {}, "files": {}}
+    catalog["outputDir"] = outputDir
+
+    models = []
+    if os.path.isdir(outputDir):
+        models = [model for model in sorted(os.listdir(outputDir)) if not model.startswith(".") and os.path.isdir(os.path.join(outputDir,model))]
+
+    changed = False
+    for model in list(catalog["dirs"].keys()):
+        if not model in models:
+            del catalog["dirs"][model]
+            catalog["files"].pop(model,None)
+            changed = True
+
+    for model in models:
+        modelDir = os.path.join(outputDir,model)
+        if catalog["dirs"].get(model) == os.path.getmtime(modelDir):
+            continue
+
+        files = catalog["files"].get(model,{})
+        entries = {}
+        for filename in os.listdir(modelDir):
+            product, name = product_type(filename)
+            if product is None or filename.startswith("."):
+                continue
+            stat = os.stat(os.path.join(modelDir,filename))
+            entry = files.get(filename)
+            if entry is None or not entry["mtime"] == stat.st_mtime or not entry["size"] == stat.st_size:
+                entry = {"name": name, "product": product, "mtime": stat.st_mtime, "size": stat.st_size}
+                entry.update(catalog_metadata(os.path.join(modelDir,filename),product))
+            entries[filename] = entry
+
+        catalog["files"][model] = entries
+        catalog["dirs"][model] = os.path.getmtime(modelDir)
+        changed = True
+
+    if changed:
+        try:
+            catalogDir = os.path.dirname(os.path.abspath(catalogFile))
+            if not os.path.isdir(catalogDir):
+                os.makedirs(catalogDir)
+            fid, tmpFile = tempfile.mkstemp(dir=catalogDir,prefix=".catalog_",suffix=".json")
+            os.close(fid)
+            json.dump(catalog,open(tmpFile,'w'))
+            os.rename(tmpFile,catalogFile)
+        except (IOError, OSError):
+            pass
+
+    return catalog
+
+def get_catalog(outputDir):
+    """
+    load_catalog(outputDir), read once per process.
+    """
+
+    if not outputDir in _catalogs:
+        _catalogs[outputDir] = load_catalog(outputDir)
+    return _catalogs[outputDir]
+
+def find_model(catalog,name,product,models):
+    """
+    First of models with the product of name in catalog, and the path of
+    the product, or (None, None).
+    """
+
+    filename = "%s%s"%(name,CATALOG_SUFFIXES[product])
+    for model in models:
+        if filename in catalog["files"].get(model,{}):
+            return model, '%s/%s/%s'%(catalog["outputDir"],model,filename)
+    return None, None
+
 def loadModelsSpec(outputDir,name):
 
     models = ["barnes_kilonova_spectra","ns_merger_spectra","kilonova_wind_spectra","macronovae-rosswog"]
-    models_ref = ["Barnes et al. (2016)","Barnes and Kasen (2013)","Kasen et al. (2014)","Rosswog et al. (2017)"]
 
     filenames = []
-    legend_names = []
-    for ii,model in enumerate(models):
-        filename = '%s/%s/%s_spec.dat'%(outputDir,model,name)
-        if not os.path.isfile(filename):
-            continue
+    model, filename = find_model(get_catalog(outputDir),name,"spec",models)
+    if filename is not None:
         filenames.append(filename)
-        legend_names.append(models_ref[ii])
-        break
     specs, names = read_files_spec(filenames)
 
     return specs
@@ -35,17 +191,11 @@ def loadModelsSpec(outputDir,name):
 def loadModels(outputDir,name):
 
     models = ["barnes_kilonova_spectra","ns_merger_spectra","kilonova_wind_spectra","ns_precursor_Lbol","BHNS","BNS","SN","tanaka_compactmergers","macronovae-rosswog","Blue","Arnett"]
-    models_ref = ["Barnes et al. (2016)","Barnes and Kasen (2013)","Kasen et al. (2014)","Metzger et al. (2015)","Kawaguchi et al. (2016)","Dietrich et al. (2016)","Guy et al. (2007)","Tanaka and Hotokezaka (2013)","Rosswog et al. (2017)","Metzger (2017)", "Inserra et al. (2013)"]
 
     filenames = []
-    legend_names = []
-    for ii,model in enumerate(models):
-        filename = '%s/%s/%s.dat'%(outputDir,model,name)
-        if not os.path.isfile(filename):
-            continue
+    model, filename = find_model(get_catalog(outputDir),name,"mag",models)
+    if filename is not None:
         filenames.append(filename)
-        legend_names.append(models_ref[ii])
-        break
     mags, names = read_files(filenames)
 
     return mags
@@ -53,37 +203,59 @@ def loadModels(outputDir,name):
 def loadModelsLbol(outputDir,name):
 
     models = ["barnes_kilonova_spectra","ns_merger_spectra","kilonova_wind_spectra","ns_precursor_Lbol","BHNS","BNS","SN","tanaka_compactmergers","macronovae-rosswog","Blue","Arnett"]
-    models_ref = ["Barnes et al. (2016)","Barnes and Kasen (2013)","Kasen et al. (2014)","Metzger et al. (2015)","Kawaguchi et al. (2016)","Dietrich et al. (2016)","Guy et al. (2007)","Tanaka and Hotokezaka (2013)","Rosswog et al. (2017)","Metzger (2017)", "Inserra et al. (2013)"]
 
     filenames = []
-    legend_names = []
-    for ii,model in enumerate(models):
-        filename = '%s/%s/%s_Lbol.dat'%(outputDir,model,name)
-        if not os.path.isfile(filename):
-            continue
+    model, filename = find_model(get_catalog(outputDir),name,"Lbol",models)
+    if filename is not None:
         filenames.append(filename)
-        legend_names.append(models_ref[ii])
-        break
     Lbols, names = read_files_lbol(filenames)
 
     return Lbols
 
+def read_rows(filename,skiprows=0):
+    """
+    Whitespace separated columns of the non-empty lines of filename, after
+    the first skiprows lines, as a list of arrays of strings.
+    """
+
+    lines = open(filename).read().splitlines()[skiprows:]
+    rows = [line.split() for line in lines if line.strip()]
+    if len(rows) == 0:
+        return []
+    ncols = min([len(row) for row in rows])
+    if max([len(row) for row in rows]) > ncols:
+        rows = [row[:ncols] for row in rows]
+    table = np.array(rows)
+    return [table[:,ii] for ii in xrange(ncols)]
+
+def group_rows(keys,values):
+    """
+    Split the rows of values by keys, keeping the file order within each
+    group. Returns a dict of key to the rows with that key.
+    """
+
+    groups = {}
+    if len(keys) == 0:
+        return groups
+    order = np.argsort(keys,kind='mergesort')
+    keys_sorted = keys[order]
+    starts = np.where(np.concatenate(([True],keys_sorted[1:] != keys_sorted[:-1])))[0]
+    ends = np.append(starts[1:],len(keys_sorted))
+    for start, end in zip(starts,ends):
+        groups[keys_sorted[start]] = values[order[start:end]]
+    return groups
+
 def loadEvent(filename):
-    lines = [line.rstrip('\n') for line in open(filename)]
-    lines = filter(None,lines)
 
+    columns = read_rows(filename)
     data = {}
-    for line in lines:
-        lineSplit = line.split(" ")
-        lineSplit = filter(None,lineSplit)
-        mjd = Time(lineSplit[0], format='isot').mjd
-        filt = lineSplit[1]
-        mag = float(lineSplit[2])
-        dmag = float(lineSplit[3])
-
-        if not filt in data:
-            data[filt] = np.empty((0,3), float)
-        data[filt] = np.append(data[filt],np.array([[mjd,mag,dmag]]),axis=0)
+    if len(columns) == 0:
+        return data
+
+    mjd = Time(columns[0], format='isot').mjd
+    values = np.vstack((mjd,columns[2].astype(float),columns[3].astype(float))).T
+    for filt, rows in group_rows(columns[1],values).items():
+        data[str(filt)] = rows
 
     return data
 
@@ -126,28 +298,165 @@ def loadEventLbol(filename):
     return data
 
 def loadLightcurves(filename):
-    lines = [line.rstrip('\n') for line in open(filename)]
-    lines = lines[1:]
-    lines = filter(None,lines)
 
+    columns = read_rows(filename,skiprows=1)
     data = {}
-    for line in lines:
-        lineSplit = line.split(" ")
-        numid = float(lineSplit[0])
-        psid = lineSplit[1]
-        filt = lineSplit[2]
-        mjd = float(lineSplit[3])
-        mag = float(lineSplit[4])
-        dmag = float(lineSplit[5])
-
-        if not psid in data:
-            data[psid] = {}
-        if not filt in data[psid]:
-            data[psid][filt] = np.empty((0,3), float)
-        data[psid][filt] = np.append(data[psid][filt],np.array([[mjd,mag,dmag]]),axis=0)
+    if len(columns) == 0:
+        return data
+
+    values = np.vstack((columns[3].astype(float),columns[4].astype(float),columns[5].astype(float))).T
+    for psid, idx in group_rows(columns[1],np.arange(len(values))).items():
+        data[str(psid)] = {}
+        for filt, rows in group_rows(columns[2][idx],values[idx]).items():
+            data[str(psid)][str(filt)] = rows
 
     return data
 
+def calc_model_times(data_out,filters=None,t0range=0.0,dt=0.1):
+    """
+    Smallest set of model epochs (days) needed to compare a light curve,
+    shifted in time by up to +/- t0range days, with the photometry in
+    data_out ({filter: (N,3) array of time, mag, error}).
+
+    With t0range = 0 these are the observation epochs themselves; otherwise
+    the points of a dt grid covering +/- t0range around every epoch.
+    """
+
+    times = []
+    for key in data_out:
+        if key == "t":
+            continue
+        if (filters is not None) and (not key in filters):
+            continue
+        times.append(np.asarray(data_out[key])[:,0])
+    if len(times) == 0:
+        return np.array([])
+    times = np.unique(np.concatenate(times))
+    times = times[np.isfinite(times)]
+
+    if t0range > 0:
+        kmin = np.floor((times-t0range)/dt).astype(int)
+        kmax = np.ceil((times+t0range)/dt).astype(int)
+        ks = np.unique(np.concatenate([np.arange(k1,k2+1) for k1,k2 in zip(kmin,kmax)]))
+        times = ks*dt
+
+    return times[times > 0]
+
+def best_zp(residuals,ivar,scale=1.0):
+    """
+    Zero point zp minimizing sum(ivar*(residuals-scale*zp)**2), or nan if
+    ivar sums to zero.
+    """
+
+    ivarsum = np.sum(ivar)
+    if not ivarsum > 0:
+        return np.nan
+    return np.sum(ivar*residuals)/(scale*ivarsum)
+
+def marginalize_zp(residuals,ivar,zprange,scale=1.0):
+    """
+    Analytic marginalization of the light-curve likelihoods over the zero
+    point zp, for chisquare(zp) = sum(ivar*(residuals-scale*zp)**2) scored
+    with the chi2 (1 dof) log density and a uniform zp prior on
+    [-zprange, zprange] that is wide compared with the likelihood.
+
+    Returns the marginal log likelihood, the best fit zp and a draw of zp
+    from its conditional posterior, to be stored as a derived parameter.
+    """
+
+    ivarsum = np.sum(ivar)
+    if not ivarsum > 0:
+        return -np.inf, np.nan, np.nan
+
+    zpbest = best_zp(residuals,ivar,scale=scale)
+    curvature = scale**2*ivarsum
+    chisquare = max(np.sum(ivar*residuals**2) - scale**2*zpbest**2*ivarsum, 1e-300)
+
+    # int chi2.pdf(chisquare + curvature*(zp-zpbest)**2, 1) dzp
+    #     = exp(-chisquare/4)*K0(chisquare/4)/sqrt(2*pi*curvature)
+    prob = -np.log(2*zprange) - 0.5*np.log(2*np.pi*curvature) - chisquare/2.0 + np.log(scipy.special.k0e(chisquare/4.0))
+
+    # zp - zpbest = s/sqrt(curvature) with s ~ N(0,1/(2*lam+1)) and lam a
+    # Gamma(1/2,1/chisquare) draw accepted with probability 1/sqrt(2*lam+1)
+    lam = None
+    for ii in xrange(100):
+        lams = np.random.gamma(0.5,1.0/chisquare,64)
+        idx = np.where(np.random.uniform(size=64) < 1.0/np.sqrt(2*lams+1))[0]
+        if len(idx) > 0:
+            lam = lams[idx[0]]
+            break
+    if lam is None:
+        zp = zpbest
+    else:
+        zp = zpbest + np.random.normal()/np.sqrt((2*lam+1)*curvature)
+
+    return prob, zpbest, zp
+
+def cache_key(*items):
+    """
+    sha1 hex digest of items (strings, numbers, None or numpy arrays), for
+    content-addressed cache files.
+    """
+
+    sha = hashlib.sha1()
+    for item in items:
+        if isinstance(item,np.ndarray):
+            sha.update(str(item.dtype).encode('utf-8'))
+            sha.update(str(item.shape).encode('utf-8'))
+            sha.update(np.ascontiguousarray(item).tobytes())
+        else:
+            sha.update(repr(item).encode('utf-8'))
+        sha.update(b"|")
+    return sha.hexdigest()
+
+def file_hash(filename):
+    """
+    sha1 hex digest of the contents of filename.
+    """
+
+    sha = hashlib.sha1()
+    with open(filename,'rb') as fid:
+        for block in iter(lambda: fid.read(1<<20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+def load_cache(cacheFile):
+    """
+    Arrays stored in the .npz cacheFile by save_cache, as a dict, or None
+    if there is no (readable) cache file.
+    """
+
+    if not os.path.isfile(cacheFile):
+        return None
+    try:
+        data = np.load(cacheFile)
+        arrays = {}
+        for key in data.files:
+            arrays[key] = data[key]
+        data.close()
+    except (IOError, ValueError):
+        return None
+    return arrays
+
+def save_cache(cacheFile,arrays):
+    """
+    Store the dict of arrays in the .npz cacheFile. The file is written
+    under a temporary name and renamed, so that concurrent readers never
+    see a partial file.
+    """
+
+    cacheDir = os.path.dirname(os.path.abspath(cacheFile))
+    if not os.path.isdir(cacheDir):
+        try:
+            os.makedirs(cacheDir)
+        except OSError:
+            pass
+
+    fid, tmpFile = tempfile.mkstemp(dir=cacheDir,suffix=".npz")
+    os.close(fid)
+    np.savez(tmpFile,**arrays)
+    os.rename(tmpFile,cacheFile)
+
 def event(dataDir,name):
 
     filename_samples = '%s/event_data/%s.dat'%(dataDir,name)
@@ -220,13 +529,72 @@ def read_posterior_samples(filename_samples):
     data_out = Table.read(filename_samples, format='ascii')
     return data_out
 
-def read_files_lbol(files):
+def source_stamp(filename,block=4096):
+    """
+    Short key of the size, modification time and first and last block bytes
+    of filename, which changes when the file is replaced even with its
+    modification time kept (cp -p, rsync -t, tar).
+    """
+
+    stat = os.stat(filename)
+    with open(filename,'rb') as fid:
+        head = fid.read(block)
+        fid.seek(max(stat.st_size-block,0))
+        tail = fid.read(block)
+    return cache_key(stat.st_size,stat.st_mtime,head,tail)[:12]
+
+def loadtxt_cached(filename,cacheDir=None,doCache=True):
+    """
+    np.loadtxt(filename), with the parsed array stored as .npy in cacheDir
+    (by default a hidden .npycache directory next to filename) and
+    memory-mapped (copy-on-write) on later reads. The cache file name
+    carries the source_stamp of filename, so it is rebuilt when the source
+    changes, and stale cache files of filename are removed.
+    """
+
+    if not doCache:
+        return np.loadtxt(filename)
+
+    if cacheDir is None:
+        cacheDir = os.path.join(os.path.dirname(os.path.abspath(filename)),".npycache")
+        prefix = os.path.basename(filename)
+    else:
+        # a shared cache directory holds files of many source directories
+        prefix = "%s_%s"%(os.path.basename(filename),cache_key(os.path.abspath(filename))[:12])
+    stamp = source_stamp(filename)
+    cacheFile = os.path.join(cacheDir,"%s_%s.npy"%(prefix,stamp))
+
+    if os.path.isfile(cacheFile):
+        try:
+            return np.load(cacheFile,mmap_mode='c')
+        except (IOError, ValueError):
+            pass
+
+    data_out = np.loadtxt(filename)
+    try:
+        if not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+        fid, tmpFile = tempfile.mkstemp(dir=cacheDir,suffix=".npy")
+        os.close(fid)
+        np.save(tmpFile,data_out)
+        os.rename(tmpFile,cacheFile)
+        # cache files of earlier versions of filename; readers that mapped
+        # them keep their data
+        for name in os.listdir(cacheDir):
+            if name.startswith(prefix+"_") and name.endswith(".npy") and len(name) == len(prefix)+17 and not os.path.join(cacheDir,name) == cacheFile:
+                os.remove(os.path.join(cacheDir,name))
+    except (IOError, OSError):
+        pass
+
+    return data_out
+
+def read_files_lbol(files,cacheDir=None,doCache=True):
 
     names = []
     Lbols = {}
     for filename in files:
         name = filename.replace("_Lbol.txt","").replace("_Lbol.dat","").split("/")[-1]
-        Lbol_d = np.loadtxt(filename)
+        Lbol_d = loadtxt_cached(filename,cacheDir=cacheDir,doCache=doCache)
 
         Lbols[name] = {}
         Lbols[name]["tt"] = Lbol_d[:,0]
@@ -236,13 +604,13 @@ def read_files_lbol(files):
 
     return Lbols, names
 
-def read_files_spec(files):
+def read_files_spec(files,cacheDir=None,doCache=True):
 
     names = []
     specs = {}
     for filename in files:
         name = filename.replace("_spec","").replace(".spec","").replace(".txt","").replace(".dat","").split("/")[-1]
-        data_out = np.loadtxt(filename)
+        data_out = loadtxt_cached(filename,cacheDir=cacheDir,doCache=doCache)
         t_d, lambda_d, spec_d = data_out[1:,0], data_out[0,1:], data_out[1:,1:]
 
         specs[name] = {}
@@ -254,13 +622,13 @@ def read_files_spec(files):
 
     return specs, names
 
-def read_files(files):
+def read_files(files,cacheDir=None,doCache=True):
 
     names = []
     mags = {}
     for filename in files:
         name = filename.replace(".txt","").replace(".dat","").split("/")[-1]
-        mag_d = np.loadtxt(filename)
+        mag_d = loadtxt_cached(filename,cacheDir=cacheDir,doCache=doCache)
 
         t = mag_d[:,0]
         mags[name] = {}
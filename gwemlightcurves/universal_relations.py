@@ -0,0 +1,97 @@
+
+# Universal relations between neutron star mass, compactness, baryonic mass
+# and tidal deformability, vectorized over posterior samples
+
+import numpy as np
+
+# Yagi and Yunes compactness-Love coefficients
+CLOVE_COEFFS = (0.360, -0.0355, 0.000705)
+
+# Buchdahl limit on the compactness
+CMAX = 4./9.
+
+def EOSfit(mns,c):
+    """
+    Baryonic mass of a neutron star of mass mns and compactness c, from
+    Eq. 8 of https://arxiv.org/pdf/1708.07714.pdf
+    """
+
+    mb = mns*(1 + 0.8857853174243745*c**1.2082383572002926)
+    return mb
+
+def CLove(lmbda,verbose=True,return_clips=False):
+    """
+    Compactness-Love relation for neutron stars from Eq. (78) of Yagi and
+    Yunes, Phys. Rep. 681, 1 (2017), using the YY coefficients.
+
+    The fit diverges as lambda -> 0 and becomes negative for very large
+    lambda, so the compactness is capped at the Buchdahl limit of 4/9 and at
+    zero. With verbose, the number and fraction of capped samples are
+    printed once per bound; with return_clips, they are also returned as a
+    dict with the keys "high", "low" and "total".
+
+    Input: Dimensionless quadrupolar tidal deformability lmbda
+    Output: Compactness (mass over radius, in geometrized units)
+    """
+
+    a0, a1, a2 = CLOVE_COEFFS
+
+    lmbda = np.atleast_1d(np.asarray(lmbda,dtype=float))
+    with np.errstate(divide='ignore',invalid='ignore'):
+        ll = np.log(lmbda)
+    cc = a0 + (a1 + a2*ll)*ll
+
+    high = cc > CMAX
+    low = cc < 0.
+    cc[high] = CMAX
+    cc[low] = 0.
+
+    clips = {"high": int(np.sum(high)), "low": int(np.sum(low)), "total": len(cc)}
+    if verbose:
+        print_clips(clips)
+
+    if return_clips:
+        return cc, clips
+    return cc
+
+def print_clips(clips):
+    """
+    Print the capped compactness counts returned by CLove.
+    """
+
+    total = max(clips["total"],1)
+    if clips["high"] > 0:
+        print("Warning: Set %d/%d (%.2f%%) compactnesses > 4/9 = 0.44... to 4/9"%(clips["high"],clips["total"],100.0*clips["high"]/total))
+    if clips["low"] > 0:
+        print("Warning: Set %d/%d (%.2f%%) compactnesses < 0 to 0"%(clips["low"],clips["total"],100.0*clips["low"]/total))
+
+def LoveC(cc):
+    """
+    Invert the compactness-Love relation of CLove.
+    """
+
+    a0, a1, a2 = CLOVE_COEFFS
+
+    ll = -(a1 + np.sqrt(a1*a1 - 4.*a2*(a0 - cc)))/(2.*a2)
+    return np.exp(ll)
+
+def tidal_lambda_from_tilde(mass1,mass2,lam_til,dlam_til):
+    """
+    Physical tidal deformabilities lambda1 and lambda2 from the effective
+    parameters lambda tilde and delta lambda tilde, Eqs. 5 and 6 of
+    https://journals.aps.org/prd/pdf/10.1103/PhysRevD.89.103012
+    """
+
+    mt = mass1 + mass2
+    eta = mass1 * mass2 / mt**2
+    q = np.sqrt(1 - 4*eta)
+
+    a = (8./13) * (1 + 7*eta - 31*eta**2)
+    b = (8./13) * q * (1 + 9*eta - 11*eta**2)
+    c = 0.5 * q * (1 - 13272*eta/1319 + 8944*eta**2/1319)
+    d = 0.5 * (1 - 15910*eta/1319 + 32850*eta**2/1319 + 3380*eta**3/1319)
+
+    lambda1 = 0.5 * ((c - d) * lam_til - (a - b) * dlam_til)/(b*c - a*d)
+    lambda2 = 0.5 * ((c + d) * lam_til - (a + b) * dlam_til)/(a*d - b*c)
+
+    return lambda1, lambda2
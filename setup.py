@@ -58,6 +58,7 @@ setup(name=PACKAGENAME,
       description=DESCRIPTION,
       scripts=scripts,
       packages=packagenames,
+      package_data={PACKAGENAME: ['data/bc/*/*.npy']},
       ext_modules=[],
       requires=['numpy', 'healpy'],
       provides=[PACKAGENAME],
@@ -0,0 +1,44 @@
+
+# Parity of the numba layer integration kernel of the Blue model with the
+# numpy reference implementation, and checks of its mass layer grid
+
+import numpy as np
+import pytest
+
+from gwemlightcurves import BlueKilonovaLightcurve
+
+# mej, vej, beta, kappa_r; beta = 0 gives infinite diffusion times. The
+# parameters are numpy floats, as drawn by the samplers and grids
+PARAMETERS = [np.array(x) for x in [(0.01,0.3,3.0,1.0),
+                                    (0.05,0.1,1.0,10.0),
+                                    (1e-4,0.5,10.0,0.1),
+                                    (0.01,0.3,0.0,1.0)]]
+
+@pytest.mark.parametrize("mej,vej,beta,kappa_r",PARAMETERS)
+def test_numba_numpy_parity(mej,vej,beta,kappa_r):
+
+    pytest.importorskip("numba")
+    tini, tmax, dt = 0.1, 14.0, 0.1
+    with np.errstate(all='ignore'):
+        reference = BlueKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,beta,kappa_r,backend="numpy")
+        compiled = BlueKilonovaLightcurve.calc_lc(tini,tmax,dt,mej,vej,beta,kappa_r,backend="numba")
+
+    for x, y in zip(reference,compiled):
+        np.testing.assert_allclose(np.asarray(y),np.asarray(x),rtol=1e-10,atol=0.0,equal_nan=True)
+
+def test_unknown_backend():
+
+    with pytest.raises(ValueError):
+        BlueKilonovaLightcurve.get_backend("cuda")
+
+@pytest.mark.parametrize("mass_resolution,adaptive_mass",[(1,False),(2,True)])
+def test_mass_resolution_too_small(mass_resolution,adaptive_mass):
+
+    with pytest.raises(ValueError):
+        BlueKilonovaLightcurve.calc_lc(0.1,14.0,0.1,0.01,0.3,3.0,1.0,backend="numpy",mass_resolution=mass_resolution,adaptive_mass=adaptive_mass)
+
+def test_mass_grid_smallest():
+
+    m = BlueKilonovaLightcurve.calc_mass_grid(1e-8,0.01,3,mfocus=(1e-4,1e-3))
+    assert np.all(np.isfinite(m))
+    np.testing.assert_allclose(m[[0,-1]],[1e-8,0.01])